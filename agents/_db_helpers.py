@@ -0,0 +1,27 @@
+# agents/_db_helpers.py
+# Shared DB lookups used by multiple agents (previously duplicated per module).
+from __future__ import annotations
+
+from sqlalchemy import bindparam
+from sqlmodel import select
+
+from db import engine, Upload
+
+# Prepared once at import: SQLAlchemy caches the compiled SQL for this
+# Executable, so per-call work is just a bind + execute on a pooled
+# connection (no Session, no statement recompilation).
+_LAST_UPLOAD_STMT = (
+    select(Upload.id)
+    .where(Upload.session_id == bindparam("sid"))
+    .order_by(Upload.id.desc())
+    .limit(1)
+)
+
+
+def get_last_upload_id(sid: str) -> int | None:
+    """Return the newest Upload.id for a session, or None."""
+    if not sid:
+        return None
+    with engine.connect() as c:
+        row = c.execute(_LAST_UPLOAD_STMT, {"sid": sid}).scalar()
+    return int(row) if row is not None else None
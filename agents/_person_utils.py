@@ -0,0 +1,12 @@
+# agents/_person_utils.py
+# Shared person-field helpers (previously duplicated per agent module).
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+# UI input ids: cnp, nume, prenume, email, telefon, adresa
+_PERSON_FIELDS = ("cnp", "nume", "prenume", "email", "telefon", "adresa")
+
+
+def missing_person_fields(person: Dict[str, Any]) -> List[str]:
+    return [k for k in _PERSON_FIELDS if not (person.get(k) or "").strip()]
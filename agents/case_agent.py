@@ -1,11 +1,10 @@
 # Calls existing services to create and manage cases, their state, and scheduling.
 from __future__ import annotations
-import os
 from .base import Agent, AgentState
 from agents.http_client import make_async_client
 from services.text_chat_messages import translate_msg
 
-LOCAL_URL = os.getenv("LOCAL_URL", "http://127.0.0.1:8000/local")
+from .settings import LOCAL_URL
 
 
 class CaseAgent(Agent):
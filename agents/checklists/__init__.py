@@ -0,0 +1,20 @@
+# agents/checklists/__init__.py
+# Cached loader for the per-program checklist JSON files in this directory.
+# Each file is read and parsed exactly once per process.
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+from jsonx import loads as _loads
+
+_CHECKLIST_DIR = Path(__file__).parent
+
+
+@lru_cache(maxsize=None)
+def load_checklist(name: str) -> dict:
+    p = _CHECKLIST_DIR / f"{name}.json"
+    try:
+        return _loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
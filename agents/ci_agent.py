@@ -3,12 +3,13 @@
 
 from __future__ import annotations
 
-import json
 import re
-from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 from .base import Agent, AgentState
+from ._person_utils import missing_person_fields
+from ._db_helpers import get_last_upload_id
+from .checklists import load_checklist
 from .tools import tool_docs_missing
 
 
@@ -17,16 +18,9 @@ from db import engine, Upload
 from sqlmodel import Session, select
 
 
-CI_CFG = json.loads((Path(__file__).parent / "checklists" / "ci.json").read_text(encoding="utf-8"))
+CI_CFG = load_checklist("ci")
 
 
-def _get_last_upload_id(sid: str) -> int | None:
-    if not sid:
-        return None
-    with Session(engine) as ss:
-        row = ss.exec(select(Upload.id).where(Upload.session_id == sid).order_by(Upload.id.desc())).first()
-    return int(row) if row is not None else None
-
 
 
 # def _extract_person_fields_from_text(raw: str) -> dict:
@@ -125,24 +119,6 @@ def _get_last_upload_id(sid: str) -> int | None:
 #     return fields, sources
 
 
-def _missing_person_fields(person: Dict[str, Any]) -> List[str]:
-    # UI input ids: cnp, nume, prenume, email, telefon, adresa
-    missing: List[str] = []
-    if not (person.get("cnp") or "").strip():
-        missing.append("cnp")
-    if not (person.get("nume") or "").strip():
-        missing.append("nume")
-    if not (person.get("prenume") or "").strip():
-        missing.append("prenume")
-    if not (person.get("email") or "").strip():
-        missing.append("email")
-    if not (person.get("telefon") or "").strip():
-        missing.append("telefon")
-    # Keep address flat for the demo UI
-    if not (person.get("adresa") or "").strip():
-        missing.append("adresa")
-    return missing
-
 class CIAgent(Agent):
     name = "carte_identitate"
 
@@ -193,7 +169,7 @@ class CIAgent(Agent):
     # ---------- handlers ----------
 
     def _maybe_run_doc_intake_on_new_upload(self, state: AgentState, app: dict, sid: str) -> AgentState | None:
-        last_id = _get_last_upload_id(sid)
+        last_id = get_last_upload_id(sid)
         if last_id is None:
             return None
 
@@ -211,7 +187,7 @@ class CIAgent(Agent):
         return state
     #
     # def _maybe_offer_autofill(self, state: AgentState, app: dict, sid: str) -> AgentState | None:
-    #     last_id = _get_last_upload_id(sid)
+    #     last_id = get_last_upload_id(sid)
     #     if last_id is None:
     #         return None
     #
@@ -314,7 +290,7 @@ class CIAgent(Agent):
             return out
 
         # 4) Missing person fields (after step3)
-        missing_fields = _missing_person_fields(person)
+        missing_fields = missing_person_fields(person)
         if missing_fields:
             state.setdefault("steps", []).append({"type":"toast","payload":{"level":"warn","title":"Date lipsa","message":"Completeaza campurile lipsa."}})
             state.setdefault("steps", []).append({"type":"focus_field","payload":{"field_id": missing_fields[0]}})
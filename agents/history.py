@@ -1,7 +1,8 @@
 # agents/history.py
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, List
 import time
 
 
@@ -30,21 +31,20 @@ class HistoryStore:
     def __init__(self, max_turns: int = 30):
         self.max_turns = max_turns
 
-        # Store structure: {session_id: [Turn, Turn, ...]}
-        self._store: Dict[str, List[Turn]] = {}
+        # Store structure: {session_id: deque([Turn, Turn, ...], maxlen=max_turns)}
+        # The bounded deque drops old turns in O(1) instead of re-slicing a list.
+        self._store: Dict[str, Deque[Turn]] = {}
 
     # Add a new turn to the history for a given session ID.
     def add_user_turn(self, sid: str, role: str, text: str) -> None:
         if not sid:
             return
-        turns = self._store.setdefault(sid, [])
+        turns = self._store.setdefault(sid, deque(maxlen=self.max_turns))
         turns.append(Turn(role=role, text=text or "", ts=time.time()))
-        if len(turns) > self.max_turns:
-            self._store[sid] = turns[-self.max_turns :]
 
     # Retrieve the raw history for a given session ID.
     def raw(self, sid: str) -> List[Dict[str, Any]]:
-        turns = self._store.get(sid, [])
+        turns = self._store.get(sid) or ()
         return [{"role": t.role, "text": t.text, "ts": t.ts} for t in turns]
 
     def filtered_for_llm(self, sid: str) -> List[Dict[str, str]]:
@@ -54,7 +54,7 @@ class HistoryStore:
         - keep normal system hints
         """
         out: List[Dict[str, str]] = []
-        for t in self._store.get(sid, []):
+        for t in self._store.get(sid) or ():
             txt = (t.text or "").strip()
             if t.role == "system" and txt in CONTROL_MARKERS:
                 continue
@@ -1,12 +1,33 @@
 import os
 import httpx
 
+# default timeout (seconds), resolved once at import
+_TIMEOUT = httpx.Timeout(float(os.getenv("HTTPX_TIMEOUT", "30")))
+
 def make_async_client(**kwargs) -> httpx.AsyncClient:
-    # default timeout (seconds)
-    timeout_s = float(os.getenv("HTTPX_TIMEOUT", "30"))
-    timeout = httpx.Timeout(timeout_s)
+    return httpx.AsyncClient(timeout=_TIMEOUT, **kwargs)
+
+
+# Application-lifetime client with keep-alive pooling: callers reuse warm
+# connections instead of paying TCP/TLS setup per request.
+_shared_client: httpx.AsyncClient | None = None
 
-    # You can also add limits if needed:
-    # limits = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+def get_shared_async_client() -> httpx.AsyncClient:
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        limits = httpx.Limits(max_keepalive_connections=32, max_connections=128,
+                              keepalive_expiry=30.0)
+        try:
+            # HTTP/2 lets back-to-back/concurrent calls to the same host
+            # multiplex over one connection (needs the optional h2 package).
+            _shared_client = httpx.AsyncClient(timeout=_TIMEOUT, limits=limits, http2=True)
+        except ImportError:
+            _shared_client = httpx.AsyncClient(timeout=_TIMEOUT, limits=limits)
+    return _shared_client
 
-    return httpx.AsyncClient(timeout=timeout, **kwargs)
+async def aclose_shared_async_client() -> None:
+    """Close the shared client (call from FastAPI shutdown)."""
+    global _shared_client
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+    _shared_client = None
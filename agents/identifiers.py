@@ -1,6 +1,7 @@
 # agents/identifiers.py
 from __future__ import annotations
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Set
 
@@ -76,14 +77,21 @@ def doc_label(doc_id: str) -> str:
     entry = cat.get(doc_id) or {}
     return entry.get("label") or doc_id
 
-def docs_as_cards(doc_ids: list[str]) -> list[dict]:
+@lru_cache(maxsize=128)
+def _cards_cached(doc_ids: tuple[str, ...]) -> tuple[dict, ...]:
+    # Required-doc lists come from a small closed set of checklists, so the
+    # catalog lookups run once per distinct list.
     cat = load_doc_catalog()
-    cards: list[dict] = []
-    for did in doc_ids:
-        entry = cat.get(did) or {}
-        cards.append({
+    return tuple(
+        {
             "id": did,
-            "label": entry.get("label") or did,
-            "hints": entry.get("hints") or [],
-        })
-    return cards
+            "label": cat.get(did, {}).get("label") or did,
+            "hints": cat.get(did, {}).get("hints") or [],
+        }
+        for did in doc_ids
+    )
+
+
+def docs_as_cards(doc_ids: list[str]) -> list[dict]:
+    # Shallow-copy so callers can mutate their card dicts freely.
+    return [dict(c) for c in _cards_cached(tuple(doc_ids))]
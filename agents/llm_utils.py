@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 import os
-import json
+from jsonx import loads as _json_loads
 from typing import Dict, Any, List, Optional
 from openai import AsyncOpenAI
 
@@ -12,8 +12,9 @@ from .settings import LLM_MODEL
 
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-_ALLOWED_INTENTS = {"carte_identitate","social","operator","taxe","legal","unknown"}
-_ALLOWED_ACTIONS = {"route","navigate","ask_clarify","hubgov_slots","hubgov_reserve","unknown", "scheduling_help"}
+# Frozensets: hashed once, O(1) membership on every routed turn.
+_ALLOWED_INTENTS = frozenset({"carte_identitate","social","operator","taxe","legal","unknown"})
+_ALLOWED_ACTIONS = frozenset({"route","navigate","ask_clarify","hubgov_slots","hubgov_reserve","unknown", "scheduling_help"})
 _ALLOWED_INTENTS_WITH_AGENTS = _ALLOWED_INTENTS - {"unknown"}
 
 
@@ -129,7 +130,7 @@ async def _call_json(system_prompt: str,
         temperature=0.1,
     )
     raw = resp.choices[0].message.content
-    return json.loads(raw)
+    return _json_loads(raw)
 
 def build_router_messages(user_text: str, history: List[Dict[str, str]] | None) -> List[Dict[str, str]]:
     """Build messages for the router classifier.
@@ -183,7 +184,7 @@ async def detect_language_with_llm(user_text: str) -> str:
             temperature=0,
         )
         content = (resp.choices[0].message.content or "").strip()
-        data = json.loads(content) if content.startswith("{") else {}
+        data = _json_loads(content) if content.startswith("{") else {}
         lang = (data.get("lang") or "").strip().lower()
         if lang in ("ro", "en"):
             return lang
@@ -207,7 +208,7 @@ async def detect_yesno_with_llm(user_text: str, topic: str = "confirm") -> str:
             temperature=0,
         )
         content = (resp.choices[0].message.content or "").strip()
-        data = json.loads(content) if content.startswith("{") else {}
+        data = _json_loads(content) if content.startswith("{") else {}
         d = (data.get("decision") or "").strip().lower()
         if d in ("yes", "no"):
             return d
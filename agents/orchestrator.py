@@ -42,6 +42,7 @@ import httpx
 import re
 from agents.http_client import make_async_client
 from agents.history import  HistoryStore
+from agents.settings import HUB_URL, LOCAL_URL
 
 
 # Import tools (side-effect functions) and RAG helper
@@ -54,7 +55,7 @@ from agents.tools import (
 
 from audit import write_audit
 from agents import rag
-from auth import get_user_from_cookie, UserCtx
+from auth import get_user_from_cookie, get_user_ctx, UserCtx
 from services.authz import actor_from_userctx, require_perm
 
 router = APIRouter()
@@ -177,7 +178,7 @@ async def _recognized_docs_from_ocr(sid: str) -> list[dict]:
     """Query Primarie /local/uploads and turn recognized kinds into doc list."""
     try:
         async with make_async_client() as client:
-            j = (await client.get(f"{os.getenv('LOCAL_URL','http://127.0.0.1:8000/local')}/uploads",
+            j = (await client.get(f"{LOCAL_URL}/uploads",
                                   params={"session_id": sid},
                                   headers={"X-Caller": "orchestrator_recognized_docs_from_ocr"})).json()
         kinds = j.get("recognized", []) or []
@@ -200,7 +201,7 @@ async def chat_api(data: ChatIn, request: Request):
     try:
         u = get_user_from_cookie(request)
         if u:
-            user_ctx = UserCtx(**u)
+            user_ctx = get_user_ctx(u.get("email")) or UserCtx(**u)
     except Exception:
         user_ctx = None
     actor = actor_from_userctx(user_ctx)
@@ -395,16 +396,31 @@ async def create_case_social(data: CreateCaseSocialIn):
     case = await tool_case_submit(person, app)  # posts to /local/cases
     return case
 
+# Short-TTL cache for slot listings: slots change on the order of minutes,
+# but the UI polls on every chat turn. Key: (backend, location_id).
+_SLOTS_TTL_S = 20.0
+_slots_cache: Dict[tuple, tuple] = {}
+
+async def _cached_slots_get(backend: str, url: str, location_id: Optional[str]) -> Any:
+    import time
+    key = (backend, location_id)
+    hit = _slots_cache.get(key)
+    now = time.monotonic()
+    if hit and now - hit[0] < _SLOTS_TTL_S:
+        return hit[1]
+    async with make_async_client() as client:
+        r = await client.get(url, params={"location_id": location_id} if location_id else None)
+        data = r.json()
+    _slots_cache[key] = (now, data)
+    return data
+
+
 @router.get("/slots")
 async def list_slots_api(location_id: Optional[str] = None):
     """
     Pass-through for hub slots so the form can populate the selector.
     """
-    import os, httpx
-    HUB_URL = os.getenv("HUB_URL", "http://127.0.0.1:8000/hub")
-    async with make_async_client() as client:
-        r = await client.get(f"{HUB_URL}/slots", params={"location_id": location_id} if location_id else None)
-        return r.json()
+    return await _cached_slots_get("hub", f"{HUB_URL}/slots", location_id)
 
 
 
@@ -426,14 +442,10 @@ async def schedule_api(data: ScheduleIn):
 
 @router.get("/slots-social")
 async def api_slots_social(location_id: Optional[str] = None):
-    LOCAL_URL = os.getenv("LOCAL_URL", "http://127.0.0.1:8000/local")
-    async with make_async_client() as client:
-        r = await client.get(f"{LOCAL_URL}/slots-social", params={"location_id": location_id} if location_id else None)
-        return r.json()
+    return await _cached_slots_get("local", f"{LOCAL_URL}/slots-social", location_id)
 
 @router.post("/schedule-social")
 async def api_schedule_social(payload: dict):
-    LOCAL_URL = os.getenv("LOCAL_URL", "http://127.0.0.1:8000/local")
     async with make_async_client() as client:
         r = await client.post(f"{LOCAL_URL}/reserve-social", json=payload)
         r.raise_for_status()
@@ -13,6 +13,7 @@ from .llm_utils import (
     get_domain_from_ui_context,
 )
 from .routing_keywords import keyword_intent, looks_like_scheduling
+from .router_cache import route_cache_key, get_cached_route, put_cached_route
 from .history import CONTROL_MARKERS, START_MARKER
 from services.text_chat_messages import translate_msg
 from .case_registry import get_case_config
@@ -142,12 +143,29 @@ class RouterAgent(Agent):
             state["next_agent"] = "scheduling"
             return state
 
-        # 2) LLM route (if enabled), else fallback keywords
+        # 2) Keyword fast-path: unambiguous keywords route directly and skip
+        # the LLM round-trip entirely; fall through only when ambiguous.
+        kw = keyword_intent(text)
+        if kw != "unknown":
+            cfg_kw = get_case_config(kw)
+            if cfg_kw:
+                state["program"] = cfg_kw.program
+                state["next_agent"] = cfg_kw.agent_name
+                return state
+            if kw == "legal":
+                state["next_agent"] = "legalgov"
+                return state
+
+        # 3) LLM route (if enabled), else fallback keywords
         intent = None
         action = None
         if LLM_USE:
             try:
-                out = await route_with_llm(text, state.get("history", []))
+                cache_key = route_cache_key(text, ui_context)
+                out = get_cached_route(cache_key)
+                if out is None:
+                    out = await route_with_llm(text, state.get("history", []))
+                    put_cached_route(cache_key, out)
                 intent = (out.get("intent") or "").strip().lower()
                 action = (out.get("action") or "").strip().lower()
             except Exception:
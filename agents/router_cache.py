@@ -0,0 +1,56 @@
+# agents/router_cache.py
+# Bounded TTL cache for LLM routing decisions.
+#
+# Routing prompts repeat a lot (same short user phrasings per ui_context),
+# so caching the {intent, action, confidence} JSON trims both latency and
+# token spend. Exact-match only; entries expire after _TTL_S.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .settings import LLM_MODEL
+
+_MAX_ENTRIES = 2048
+_TTL_S = 3600.0
+_MIN_CONFIDENCE = 0.7
+
+_cache: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def route_cache_key(text: str, ui_context: str) -> str:
+    payload = json.dumps(
+        {"model": LLM_MODEL, "text": (text or "").strip().lower(), "ui": ui_context or ""},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_route(key: str) -> Optional[Dict[str, Any]]:
+    hit = _cache.get(key)
+    if not hit:
+        return None
+    ts, out = hit
+    if time.monotonic() - ts > _TTL_S:
+        _cache.pop(key, None)
+        return None
+    _cache.move_to_end(key)
+    return out
+
+
+def put_cached_route(key: str, out: Dict[str, Any]) -> None:
+    # Only cache confident decisions to avoid poisoning the fast path.
+    try:
+        conf = float(out.get("confidence") or 0.0)
+    except Exception:
+        conf = 0.0
+    if conf < _MIN_CONFIDENCE:
+        return
+    _cache[key] = (time.monotonic(), out)
+    _cache.move_to_end(key)
+    while len(_cache) > _MAX_ENTRIES:
+        _cache.popitem(last=False)
@@ -3,63 +3,133 @@ from __future__ import annotations
 import re
 from typing import Optional
 
+# Optional C-accelerated multi-pattern matcher (pip install pyahocorasick).
+# If unavailable we fall back to one precompiled alternation regex per intent.
+try:
+    import ahocorasick  # type: ignore
+except Exception:
+    ahocorasick = None
+
 
 def _has_any(text: str, patterns: list[str]) -> bool:
     return any(re.search(p, text) for p in patterns)
 
 
+# Literal keyword table for intent detection.
+# Entries: (intent, keyword, left_boundary, right_boundary).
+# Alternations from the old per-intent regex lists (tasks?, caz(uri)?,
+# benefici(i|u), expir(a|at)) are expanded to plain literals so one linear
+# scan of the message covers all intents at once.
+_KEYWORDS: tuple[tuple[str, str, bool, bool], ...] = (
+    # Operator / backoffice
+    ("operator", "operator", True, True),
+    ("operator", "task", True, True),
+    ("operator", "tasks", True, True),
+    ("operator", "caz", True, True),
+    ("operator", "cazuri", True, True),
+    ("operator", "dosar", True, True),
+    ("operator", "admin", True, True),
+    # Social aid / benefits
+    ("social", "ajutor social", False, False),
+    ("social", "vmi", True, True),
+    ("social", "venit minim", False, False),
+    ("social", "beneficii", False, False),
+    ("social", "beneficiu", False, False),
+    ("social", "assistenta sociala", True, True),
+    # Identity card
+    ("carte_identitate", "carte de identitate", False, False),
+    ("carte_identitate", "buletin", True, True),
+    ("carte_identitate", "ci", True, True),
+    ("carte_identitate", "c.i.", True, True),
+    ("carte_identitate", "preschimbare", False, True),
+    ("carte_identitate", "expira", False, False),
+    ("carte_identitate", "schimbare domiciliu", False, False),
+    ("carte_identitate", "viza de flotant", False, False),
+    # Taxes / local payments (example 3rd use case scaffold)
+    ("taxe", "taxe", True, True),
+    ("taxe", "impozit", False, False),
+    ("taxe", "ghiseul", False, False),
+    ("taxe", "plata", False, True),
+    ("taxe", "amenzi", True, True),
+    # Legal / procedure questions
+    ("legal", "lege", False, False),
+    ("legal", "hotarare", False, False),
+    ("legal", "regulament", False, False),
+    ("legal", "care este procedura", False, False),
+    ("legal", "acte necesare", False, False),
+)
+
+# Keep the original if-chain ordering: first matching intent wins.
+_INTENT_PRIORITY = ("operator", "social", "carte_identitate", "taxe", "legal")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _boundary_ok(t: str, start: int, end: int, lwb: bool, rwb: bool) -> bool:
+    """Replicate regex \\b semantics at the edges of a literal match."""
+    if lwb:
+        prev_word = _is_word(t[start - 1]) if start > 0 else False
+        if _is_word(t[start]) == prev_word:
+            return False
+    if rwb:
+        next_word = _is_word(t[end + 1]) if end + 1 < len(t) else False
+        if _is_word(t[end]) == next_word:
+            return False
+    return True
+
+
+def _build_automaton():
+    if ahocorasick is None:
+        return None
+    a = ahocorasick.Automaton()
+    for intent, kw, lwb, rwb in _KEYWORDS:
+        a.add_word(kw, (intent, len(kw), lwb, rwb))
+    a.make_automaton()
+    return a
+
+
+def _build_intent_regexes() -> dict[str, re.Pattern]:
+    parts: dict[str, list[str]] = {}
+    for intent, kw, lwb, rwb in _KEYWORDS:
+        pat = ("\\b" if lwb else "") + re.escape(kw) + ("\\b" if rwb else "")
+        parts.setdefault(intent, []).append(pat)
+    return {intent: re.compile("|".join(pats)) for intent, pats in parts.items()}
+
+
+_AUTOMATON = _build_automaton()
+_INTENT_RE = _build_intent_regexes()
+
+
 def keyword_intent(text: str) -> str:
     """Deterministic (non-LLM) intent detection for Romanian phrasing.
 
     Notes:
-    - Uses regex with word boundaries for short tokens (ex: CI).
+    - Single Aho-Corasick scan over all keywords (regex fallback per intent).
+    - Word boundaries enforced for short tokens (ex: CI).
     - Keep conservative: return 'unknown' if ambiguous.
     """
-    t = (text or "").strip().lower()
+    # Collapse whitespace so multi-word keywords match like the old \s+ regexes.
+    t = " ".join((text or "").lower().split())
     if not t:
         return "unknown"
 
-    # Operator / backoffice
-    if _has_any(t, [r"\boperator\b", r"\btasks?\b", r"\bcaz(uri)?\b", r"\bdosar\b", r"\badmin\b"]):
-        return "operator"
-
-    # Social aid / benefits
-    if _has_any(t, [
-        r"ajutor\s+social",
-        r"\bvmi\b",
-        r"venit\s+minim",
-        r"benefici(i|u)",
-        r"\bassistenta\s+sociala\b",
-    ]):
-        return "social"
-
-    # Identity card
-    if _has_any(t, [
-        r"carte\s+de\s+identitate",
-        r"\bbuletin\b",
-        r"\bci\b",
-        r"\bc\.i\.\b",
-        r"preschimbare\b",
-        r"expir(a|at)",
-        r"schimbare\s+domiciliu",
-        r"viza\s+de\s+flotant",
-    ]):
-        return "carte_identitate"
-
-    # Taxes / local payments (example 3rd use case scaffold)
-    if _has_any(t, [
-        r"\btaxe\b",
-        r"impozit",
-        r"ghiseul",
-        r"plata\b",
-        r"\bamenzi\b",
-    ]):
-        return "taxe"
-
-    # Legal / procedure questions
-    if _has_any(t, [r"lege", r"hotarare", r"regulament", r"care\s+este\s+procedura", r"acte\s+necesare"]):
-        return "legal"
+    if _AUTOMATON is not None:
+        hits: set[str] = set()
+        for end, (intent, kwlen, lwb, rwb) in _AUTOMATON.iter(t):
+            if intent in hits:
+                continue
+            if _boundary_ok(t, end - kwlen + 1, end, lwb, rwb):
+                hits.add(intent)
+        for intent in _INTENT_PRIORITY:
+            if intent in hits:
+                return intent
+        return "unknown"
 
+    for intent in _INTENT_PRIORITY:
+        if _INTENT_RE[intent].search(t):
+            return intent
     return "unknown"
 
 
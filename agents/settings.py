@@ -10,3 +10,8 @@ def env_flag(name: str, default: bool = False) -> bool:
 
 LLM_USE: bool = env_flag("LLM_USE", False)
 LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-5-mini")
+
+# Mock service endpoints, resolved once at import so hot paths reference a
+# module constant instead of hitting os.environ per request.
+HUB_URL: str = os.getenv("HUB_URL", "http://127.0.0.1:8000/hub")
+LOCAL_URL: str = os.getenv("LOCAL_URL", "http://127.0.0.1:8000/local")
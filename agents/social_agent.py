@@ -3,83 +3,61 @@
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
+import re
 from typing import Any, Dict, List
 
 from services.text_chat_messages import translate_msg
 from .base import Agent, AgentState
+from .checklists import load_checklist
+from ._person_utils import missing_person_fields
 from .tools import tool_docs_missing
-from db import engine, Upload
-from sqlmodel import Session, select
-
-
-def _get_last_upload_id(sid: str) -> int | None:
-    if not sid:
-        return None
-    with Session(engine) as ss:
-        row = ss.exec(
-            select(Upload.id)
-            .where(Upload.session_id == sid)
-            .order_by(Upload.id.desc())
-        ).first()
-    return int(row) if row is not None else None
-
-
-SOCIAL_CFG = json.loads(
-    (Path(__file__).parent / "checklists" / "social.json").read_text(encoding="utf-8")
-)
-
-
-def _missing_person_fields(person: Dict[str, Any]) -> List[str]:
-    missing: List[str] = []
-    if not (person.get("cnp") or "").strip():
-        missing.append("cnp")
-    if not (person.get("nume") or "").strip():
-        missing.append("nume")
-    if not (person.get("prenume") or "").strip():
-        missing.append("prenume")
-    if not (person.get("email") or "").strip():
-        missing.append("email")
-    if not (person.get("telefon") or "").strip():
-        missing.append("telefon")
-    if not (person.get("adresa") or "").strip():
-        missing.append("adresa")
-    return missing
+from ._db_helpers import get_last_upload_id
+
+
+SOCIAL_CFG = load_checklist("social")
+
+# One C-level scan instead of a Python loop of substring checks per turn.
+# "program" also covers "programare".
+_STEP1_RX = re.compile(r"program|slot|ajutor|social|vreau")
 
 
 class SocialAgent(Agent):
     name = "social"
 
     async def handle(self, state: AgentState) -> AgentState:
+        # Normalize once: everything below can rely on plain dicts.
         app = state.get("app") or {}
+        if not isinstance(app, dict):
+            app = {}
         person = state.get("person") or {}
+        if not isinstance(person, dict):
+            person = {}
         msg_raw = (state.get("message") or "")
         msg = msg_raw.lower()
         sid = state.get("session_id") or ""
 
-        if isinstance(app, dict):
-            app.setdefault("ui_context", "social")
-            app["program"] = "AS"
+        app.setdefault("ui_context", "social")
+        app["program"] = "AS"
         state["app"] = app
 
         # If user uploaded docs (or uploads changed), automatically run intake+OCR.
-        last_id = _get_last_upload_id(sid)
+        # Memoize on the state so re-entry within the same graph run (e.g. after
+        # doc_intake returns here) does not issue a second SELECT.
+        if "_last_upload_id" in state:
+            last_id = state["_last_upload_id"]
+        else:
+            last_id = state["_last_upload_id"] = get_last_upload_id(sid)
         if last_id is not None:
-            seen = app.get("uploads_seen_last_id") if isinstance(app, dict) else None
-            if seen != last_id:
-                if isinstance(app, dict):
-                    app["uploads_seen_last_id"] = last_id
-                    state["app"] = app
+            if app.get("uploads_seen_last_id") != last_id:
+                app["uploads_seen_last_id"] = last_id
                 state["return_to"] = self.name
                 state["next_agent"] = "doc_intake"
                 state["reply"] = translate_msg(app, "social_detect_uploads")
                 return state
 
         # Wizard Step 1/3: slot required.
-        selected_slot_id = app.get("selected_slot_id") if isinstance(app, dict) else None
-        if not selected_slot_id:
-            if (not msg) or any(k in msg for k in ["program", "programare", "slot", "ajutor", "social", "vreau"]):
+        if not app.get("selected_slot_id"):
+            if (not msg) or _STEP1_RX.search(msg):
                 state["reply"] = translate_msg(app, "social_step1")
                 state["next_agent"] = None
                 return state
@@ -87,29 +65,27 @@ class SocialAgent(Agent):
         # Wizard Step 2/3: eligibility + slot (phase2)
         # UI sends __phase2_done__ when slot+elig are selected.
         # For safety, also check app.type_elig_confirmed.
-        type_elig_confirmed = bool(app.get("type_elig_confirmed")) if isinstance(app, dict) else False
-        if ("__phase2_done__" in msg_raw) or type_elig_confirmed:
-            if isinstance(app, dict):
-                app["type_elig_confirmed"] = True
-                state["app"] = app
+        if ("__phase2_done__" in msg_raw) or bool(app.get("type_elig_confirmed")):
+            app["type_elig_confirmed"] = True
         else:
             # If not done, guide.
-            elig = (app.get("eligibility_reason") if isinstance(app, dict) else "") or ""
+            elig = app.get("eligibility_reason") or ""
             if not elig or elig == "None":
                 state["reply"] = translate_msg(app, "social_step2")
                 state["next_agent"] = None
                 return state
 
         # Step 3/3: person fields + docs
-        missing_fields = _missing_person_fields(person)
+        missing_fields = missing_person_fields(person)
         if missing_fields:
-            state.setdefault("steps", []).append({"type":"toast","payload":{"level":"warn","title":"Date lipsa","message": translate_msg(app, "social_missing_fields_toast")}})
-            state.setdefault("steps", []).append({"type":"focus_field","payload":{"field_id": missing_fields[0]}})
+            state.setdefault("steps", []).extend([
+                {"type":"toast","payload":{"level":"warn","title":"Date lipsa","message": translate_msg(app, "social_missing_fields_toast")}},
+                {"type":"focus_field","payload":{"field_id": missing_fields[0]}},
+            ])
             state["reply"] = translate_msg(app, "social_step3")
             state["next_agent"] = None
             return state
 
-        required = set(SOCIAL_CFG.get("required_docs") or [])
         docs = app.get("docs") or []
         if not isinstance(docs, list):
             docs = []
@@ -118,8 +94,10 @@ class SocialAgent(Agent):
         missing_cards = missing_info.get("missing_cards") or []
 
         if missing_docs:
-            state.setdefault("steps", []).append({"type":"highlight_missing_docs","payload":{"kinds": missing_docs}})
-            state.setdefault("steps", []).append({"type":"open_section","payload":{"section_id":"slotsBox"}})
+            state.setdefault("steps", []).extend([
+                {"type":"highlight_missing_docs","payload":{"kinds": missing_docs}},
+                {"type":"open_section","payload":{"section_id":"slotsBox"}},
+            ])
 
             pretty_missing_docs = ", ".join([c.get("label") or c.get("id") for c in missing_cards]) if missing_cards else ", ".join(
                 missing_docs)
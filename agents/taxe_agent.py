@@ -4,63 +4,61 @@
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from typing import Any, Dict, List
 
 from .base import Agent, AgentState
+from .checklists import load_checklist
+from ._person_utils import missing_person_fields
 from services.text_chat_messages import translate_msg
 
 
-TAXE_CFG = json.loads(
-    (Path(__file__).parent / "checklists" / "taxe.json").read_text(encoding="utf-8")
-)
+TAXE_CFG = load_checklist("taxe")
 
-
-def _missing_person_fields(person: Dict[str, Any]) -> List[str]:
-    missing: List[str] = []
-    for k in ("cnp", "nume", "prenume", "email", "telefon", "adresa"):
-        if not (person.get(k) or "").strip():
-            missing.append(k)
-    return missing
+# Computed once at import; avoids rebuilding the set on every request.
+_REQUIRED_DOCS: frozenset = frozenset(TAXE_CFG.get("required_docs") or [])
 
 
 class TaxeAgent(Agent):
     name = "taxe"
 
     async def handle(self, state: AgentState) -> AgentState:
+        # Normalize once: everything below can rely on plain dicts.
         app = state.get("app") or {}
+        if not isinstance(app, dict):
+            app = {}
         person = state.get("person") or {}
+        if not isinstance(person, dict):
+            person = {}
         msg = (state.get("message") or "").lower()
 
-        if isinstance(app, dict):
-            app.setdefault("ui_context", "taxe")
-            app["program"] = "TAXE"
+        app.setdefault("ui_context", "taxe")
+        app["program"] = "TAXE"
         state["app"] = app
 
         # Step 1: ensure person fields exist (same fields as the other demos for consistency)
-        missing_fields = _missing_person_fields(person if isinstance(person, dict) else {})
+        missing_fields = missing_person_fields(person)
         if missing_fields:
-            state.setdefault("steps", []).append({
-                "type": "toast",
-                "payload": {
-                    "level": "warn",
-                    "title": "Date lipsa",
-                    "message": "Completeaza campurile necesare in formular.",
+            state.setdefault("steps", []).extend([
+                {
+                    "type": "toast",
+                    "payload": {
+                        "level": "warn",
+                        "title": "Date lipsa",
+                        "message": "Completeaza campurile necesare in formular.",
+                    },
                 },
-            })
-            state.setdefault("steps", []).append({"type": "focus_field", "payload": {"field_id": missing_fields[0]}})
+                {"type": "focus_field", "payload": {"field_id": missing_fields[0]}},
+            ])
             state["reply"] = "Pentru Taxe si Impozite, am nevoie intai de datele tale (CNP, nume, prenume, email, telefon, adresa)."
             state["next_agent"] = None
             return state
 
         # Step 2: require docs from checklist
-        required = set(TAXE_CFG.get("required_docs") or [])
         docs = app.get("docs") or []
         if not isinstance(docs, list):
             docs = []
-        present = {d.get("kind") for d in docs if d.get("status") == "ok"}
-        missing_docs = sorted([d for d in required if d not in present])
+        present = frozenset(d["kind"] for d in docs if d.get("status") == "ok" and "kind" in d)
+        missing_docs = sorted(_REQUIRED_DOCS - present)
         if missing_docs:
             state.setdefault("steps", []).append({"type": "highlight_missing_docs", "payload": {"kinds": missing_docs}})
             state["reply"] = "Pentru a continua, incarca documentele: " + ", ".join(missing_docs) + "."
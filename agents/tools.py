@@ -12,12 +12,16 @@
 #
 # The orchestrator coordinates these tools in a consistent flow.
 
+import asyncio
+import functools
 import os, json
+import random
+import time
 from pathlib import Path
 import httpx
-from sympy.multipledispatch.dispatcher import RaiseNotImplementedError
 from .identifiers import docs_as_cards
-from agents.http_client import make_async_client
+from agents.http_client import get_shared_async_client
+from jsonx import dumps as _json_dumps
 
 # External service endpoints (mock servers)
 RUN_MODE = os.getenv("RUN_MODE", "mounted").lower()  # "mounted" | "split"
@@ -30,80 +34,178 @@ LOCAL_URL = os.getenv("LOCAL_URL", _default_local)
 # External service endpoints (mock servers)
 
 
+# Cap on concurrently in-flight tool calls, so orchestrator bursts cannot
+# exhaust the shared connection pool.
+_SEM = asyncio.Semaphore(int(os.getenv("TOOL_CONC", "200")))
+
+
+def with_retry(max_attempts: int = 3, base: float = 0.05):
+    """
+    Retry transient failures (transport errors, 5xx) with jittered
+    exponential backoff, holding the concurrency semaphore per attempt.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            last: Exception | None = None
+            for n in range(max_attempts):
+                try:
+                    async with _SEM:
+                        return await fn(*args, **kwargs)
+                except httpx.TransportError as e:
+                    last = e
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code < 500:
+                        raise
+                    last = e
+                await asyncio.sleep(base * (2 ** n) + random.random() * base)
+            raise last
+        return wrapper
+    return deco
+
+
+# orjson-backed request bodies: encode once here instead of letting httpx
+# run payloads through stdlib json per call.
+_JSON_HEADERS = {"content-type": "application/json"}
+
+def _json_content(payload) -> bytes:
+    return _json_dumps(payload).encode("utf-8")
+
+
 # --------------------------- ELIGIBILITY & DOCS ---------------------------
 
 
+# Eligibility reason -> decided CI application type, precomputed at module
+# scope so per-call work is one dict lookup. Unknown reasons fall back to CIS.
+_ELIG = {
+    "AGE_14": "CEI",
+    "EXP_60": "CEI",
+    "CHANGE": "CEI",
+    "LOSS": "CIP",
+}
+
+
+def tool_eligibility(eligibility_reason: str) -> dict:
+    """Decide the CI application type from the eligibility reason."""
+    return {"decided_type": _ELIG.get(eligibility_reason, "CIS"),
+            "reason": eligibility_reason}
+
+
+def tool_eligibility_batch(reasons: list[str]) -> list[str]:
+    """Vectorized variant for classifying many reasons at once."""
+    get = _ELIG.get
+    return [get(r, "CIS") for r in reasons]
+
+
 _CHECKLIST_DIR = Path(__file__).parent / "checklists"
 
 
+def _read_checklists() -> dict[str, dict]:
+    out: dict[str, dict] = {}
+    for p in _CHECKLIST_DIR.glob("*.json"):
+        try:
+            out[p.stem] = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            out[p.stem] = {}
+    return out
+
+
+# All checklists are loaded eagerly at import: no open/read/parse syscalls
+# on the request path. Treat the dicts as read-only.
+_CHECKLISTS = _read_checklists()
+
+
 def _load_checklist(name: str) -> dict:
-    p = _CHECKLIST_DIR / f"{name}.json"
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
+    return _CHECKLISTS.get(name, {})
 
 
-def tool_docs_required(program: str, app_type: str | None = None, elig_reason: str | None = None) -> dict:
-    """Return required document ids.
+@functools.lru_cache(maxsize=128)
+def _docs_required_cached(prog: str, app_type: str, elig_reason: str) -> tuple[str, ...]:
+    """Cached core of tool_docs_required over normalized inputs.
 
-    Design:
-    - CI uses a structured checklist: common_docs + types + eligibility_docs.
-    - Social/Taxe can use a simple top-level required_docs.
+    Inputs come from a tiny fixed domain (program x type x reason), so the
+    checklist merge + sort runs once per combination.
     """
     required: set[str] = set()
-    prog = (program or "").strip().lower()
 
     if prog in {"ci", "carte_identitate"}:
         cfg = _load_checklist("ci")
         for d in (cfg.get("common_docs") or []):
             if isinstance(d, str) and d:
                 required.add(d)
-        t = (app_type or "").strip().upper()
-        if t:
-            spec = (cfg.get("types") or {}).get(t) or {}
+        if app_type:
+            spec = (cfg.get("types") or {}).get(app_type) or {}
             for d in (spec.get("required_docs") or []):
                 if isinstance(d, str) and d:
                     required.add(d)
-        r = (elig_reason or "").strip().upper()
-        if r:
-            for d in ((cfg.get("eligibility_docs") or {}).get(r) or []):
+        if elig_reason:
+            for d in ((cfg.get("eligibility_docs") or {}).get(elig_reason) or []):
                 if isinstance(d, str) and d:
                     required.add(d)
-        return {"required": sorted(required)}
 
     # Social aid (ajutor social)
-    if prog in {"as", "social"}:
+    elif prog in {"as", "social"}:
         cfg = _load_checklist("social")
         for d in (cfg.get("required_docs") or []):
             if isinstance(d, str) and d:
                 required.add(d)
-        return {"required": sorted(required)}
 
     # Taxes (3rd demo use case)
-    if prog in {"taxe"}:
+    elif prog in {"taxe"}:
         cfg = _load_checklist("taxe")
         for d in (cfg.get("required_docs") or []):
             if isinstance(d, str) and d:
                 required.add(d)
-        return {"required": sorted(required)}
 
-    required_list = sorted(required)
+    return tuple(sorted(required))
+
+
+def tool_docs_required(program: str, app_type: str | None = None, elig_reason: str | None = None) -> dict:
+    """Return required document ids.
+
+    Design:
+    - CI uses a structured checklist: common_docs + types + eligibility_docs.
+    - Social/Taxe can use a simple top-level required_docs.
+    """
+    prog = (program or "").strip().lower()
+    required_list = list(_docs_required_cached(prog,
+                                               (app_type or "").strip().upper(),
+                                               (elig_reason or "").strip().upper()))
+    if prog in {"ci", "carte_identitate", "as", "social", "taxe"}:
+        return {"required": required_list}
     return {"required": required_list, "required_cards": docs_as_cards(required_list)}
 
 
+# Warm the closed (program, type, reason) enumeration so even first calls
+# hit the lru_cache above.
+for _t in ("", "CEI", "CIS", "CIP", "VR"):
+    for _r in ("", "AGE_14", "EXP_60", "CHANGE", "LOSS", "CHANGE_ADDR"):
+        _docs_required_cached("ci", _t, _r)
+for _p in ("social", "taxe"):
+    _docs_required_cached(_p, "", "")
+del _t, _r, _p
+
+
+@functools.lru_cache(maxsize=64)
+def _required_set(prog: str, app_type: str, elig_reason: str) -> frozenset[str]:
+    return frozenset(_docs_required_cached(prog, app_type, elig_reason))
+
+
 def tool_docs_missing(program: str, app_type: str | None, eligibility_reason: str | None, docs: list[dict]) -> dict:
     """
     Compare required documents vs. those provided and return the missing ones.
     """
-    required = set(tool_docs_required(program, app_type=app_type, elig_reason=eligibility_reason)["required"])
-    provided = {d["kind"] for d in docs if d.get("status") == "ok"}
-    missing_list = sorted(list(required - provided))
+    required = _required_set((program or "").strip().lower(),
+                             (app_type or "").strip().upper(),
+                             (eligibility_reason or "").strip().upper())
+    missing_list = sorted(required.difference(
+        d["kind"] for d in docs if d.get("status") == "ok" and "kind" in d))
     return {"missing": missing_list, "missing_cards": docs_as_cards(missing_list)}
 
 
 # --------------------------- CASE SUBMISSION ---------------------------
 
+@with_retry()
 async def tool_case_submit(person: dict, app: dict) -> dict:
     """
     Create a new case via the Primarie Locala mock service.
@@ -115,34 +217,50 @@ async def tool_case_submit(person: dict, app: dict) -> dict:
         "person": person or {},
         "application": app or {}
     }
-    async with make_async_client() as client:
-        r = await client.post(f"{LOCAL_URL}/cases", json=payload)
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.post(f"{LOCAL_URL}/cases", content=_json_content(payload), headers=_JSON_HEADERS)
+    r.raise_for_status()
+    return r.json()
 
 
 # --------------------------- PAYMENT & SIGNATURE ---------------------------
 
 async def tool_payment(case_id: str, amount: float) -> dict:
     try:
-        async with make_async_client() as client:
-            r = await client.post(f"{LOCAL_URL}/payments", json={"case_id": case_id, "amount": amount})
-            r.raise_for_status()
-            return r.json()
+        client = get_shared_async_client()
+        r = await client.post(f"{LOCAL_URL}/payments", content=_json_content({"case_id": case_id, "amount": amount}), headers=_JSON_HEADERS)
+        r.raise_for_status()
+        return r.json()
     except Exception as e:
         return {"skipped": True, "reason": f"payments endpoint missing: {e}"}
 
 async def tool_signature(case_id: str) -> dict:
     try:
-        async with make_async_client() as client:
-            r = await client.post(f"{LOCAL_URL}/sign", json={"case_id": case_id})
-            r.raise_for_status()
-            return r.json()
+        client = get_shared_async_client()
+        r = await client.post(f"{LOCAL_URL}/sign", content=_json_content({"case_id": case_id}), headers=_JSON_HEADERS)
+        r.raise_for_status()
+        return r.json()
     except Exception as e:
         return {"skipped": True, "reason": f"signature endpoint missing: {e}"}
 
 # --------------------------- SCHEDULING ---------------------------
 
+# Short-TTL cache of the HUB slot list, keyed by location_id: many users
+# scheduling in the same window share one GET. Safe under asyncio — no
+# preemption between the dict operations.
+_SLOTS_TTL_S = 2.0
+_slots_cache: dict[str, tuple[float, list]] = {}
+
+
+async def _get_slots_cached(client: httpx.AsyncClient, location_id: str) -> list:
+    hit = _slots_cache.get(location_id)
+    if hit is not None and (time.monotonic() - hit[0]) < _SLOTS_TTL_S:
+        return hit[1]
+    slots = (await client.get(f"{HUB_URL}/slots", params={"location_id": location_id})).json()
+    _slots_cache[location_id] = (time.monotonic(), slots)
+    return slots
+
+@with_retry()
 async def tool_schedule(app_type: str,
                         location_id: str="Bucuresti-S1",
                         cnp: str | None = None) -> dict:
@@ -150,61 +268,84 @@ async def tool_schedule(app_type: str,
     If the application type is CEI, fetch slot list and schedule the first available slot.
     Otherwise, return a "local" placeholder appointment for CIS/CIP.
     """
-    async with make_async_client() as client:
-        if app_type == "CEI":
-            slots = (await client.get(f"{HUB_URL}/slots", params={"location_id":location_id})).json()
+    if app_type == "CEI":
+        client = get_shared_async_client()
+        # Single aggregated round-trip; fall back to the old GET slots +
+        # POST appointment pair when the hub lacks the endpoint.
+        r = await client.post(f"{HUB_URL}/slots/first-available",
+                              content=_json_content({"location_id": location_id, "cnp": cnp}),
+                              headers=_JSON_HEADERS)
+        if r.is_success:
+            return r.json()
+        if r.status_code not in (404, 405):
+            # Hub error (e.g. 5xx): raise so with_retry engages instead of
+            # handing the error body back as an "appointment".
+            r.raise_for_status()
+        slots = await _get_slots_cached(client, location_id)
+        if not slots:
+            return {"via":"HUB","error":"no_slots"}
+        s0 = slots[0]
+        r = await client.post(f"{HUB_URL}/appointments",
+                              content=_json_content({"person": {}, "docs_ok": True,
+                                                     "slot_id": s0["id"], "cnp": cnp if cnp else None}),
+                              headers=_JSON_HEADERS)
+        if r.status_code in (404, 409):
+            # Cached slot went stale (already taken/removed): refresh once.
+            _slots_cache.pop(location_id, None)
+            slots = await _get_slots_cached(client, location_id)
             if not slots:
                 return {"via":"HUB","error":"no_slots"}
             s0 = slots[0]
-            appt = (await client.post(f"{HUB_URL}/appointments",
-                                      json={"person": {}, "docs_ok": True,
-                                            "slot_id": s0["id"], "cnp": cnp if cnp else None
-                                            })).json()
-            return {"via":"HUB", "slot": s0, "appointment": appt}
-        else:
-            # Local mock scheduling for CIS/CIP
-            return {"via":"LOCAL", "appointment": {"appt_id":"local-na","when":"soon","location_id":"Primarie-01"}}
+            r = await client.post(f"{HUB_URL}/appointments",
+                                  content=_json_content({"person": {}, "docs_ok": True,
+                                                         "slot_id": s0["id"], "cnp": cnp if cnp else None}),
+                                  headers=_JSON_HEADERS)
+        return {"via":"HUB", "slot": s0, "appointment": r.json()}
+    else:
+        # Local mock scheduling for CIS/CIP
+        return {"via":"LOCAL", "appointment": {"appt_id":"local-na","when":"soon","location_id":"Primarie-01"}}
 
 
 async def tool_schedule_social_by_slot(slot_id: str, cnp: str | None = None):
-    async with make_async_client() as client:
-        r = await client.post(f"{LOCAL_URL}/reserve-social", json={"slot_id": slot_id, "cnp": cnp})
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.post(f"{LOCAL_URL}/reserve-social", content=_json_content({"slot_id": slot_id, "cnp": cnp}), headers=_JSON_HEADERS)
+    r.raise_for_status()
+    return r.json()
 
 
 async def tool_schedule_by_slot(slot_id: str, cnp: str | None = None):
-    async with make_async_client() as client:
-        payload = {"slot_id": slot_id}
-        if cnp:
-            payload["cnp"] = cnp
-        r = await client.post(f"{HUB_URL}/appointments", json=payload)
-        r.raise_for_status()
-        return r.json()
+    payload = {"slot_id": slot_id}
+    if cnp:
+        payload["cnp"] = cnp
+    client = get_shared_async_client()
+    r = await client.post(f"{HUB_URL}/appointments", content=_json_content(payload), headers=_JSON_HEADERS)
+    r.raise_for_status()
+    return r.json()
 
 
 async def tool_reschedule(appt_id: str, new_slot_id: str) -> dict:
     """
     Reschedule an existing CEI appointment to a new slot.
     """
-    async with make_async_client() as client:
-        r = await client.patch(f"{HUB_URL}/appointments/{appt_id}", json={"slot_id": new_slot_id})
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.patch(f"{HUB_URL}/appointments/{appt_id}", content=_json_content({"slot_id": new_slot_id}), headers=_JSON_HEADERS)
+    r.raise_for_status()
+    return r.json()
 
 
 async def tool_cancel_appointment(appt_id: str) -> dict:
     """
     Cancel an existing CEI appointment.
     """
-    async with make_async_client() as client:
-        r = await client.delete(f"{HUB_URL}/appointments/{appt_id}")
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.delete(f"{HUB_URL}/appointments/{appt_id}")
+    r.raise_for_status()
+    return r.json()
 
 
 # --------------------------- FILE UPLOAD + OCR ---------------------------
 
+@with_retry()
 async def tool_upload(file_bytes: bytes, filename: str, docHint: str = "auto", sid: str = "anon") -> dict:
     """
     Forward a file to the Primarie Locala mock OCR endpoint.
@@ -212,32 +353,98 @@ async def tool_upload(file_bytes: bytes, filename: str, docHint: str = "auto", s
     """
     files = {"file": (filename, file_bytes, "application/octet-stream")}
     data = {"docHint": docHint, "sid": sid}
-    async with make_async_client() as client:
-        r = await client.post(f"{LOCAL_URL}/uploads", files=files, data=data)
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.post(f"{LOCAL_URL}/uploads", files=files, data=data)
+    r.raise_for_status()
+    return r.json()
 
 
+async def tool_upload_stream(stream, filename: str, docHint: str = "auto",
+                             sid: str = "anon") -> dict:
+    """
+    Streaming variant of tool_upload: forwards an AsyncIterable[bytes] (or
+    bytes) as a raw octet-stream body with metadata headers, so peak memory
+    stays O(chunk) on the client and bytes flow as soon as they arrive.
+    """
+    from urllib.parse import quote
+
+    headers = {
+        "content-type": "application/octet-stream",
+        "x-filename": quote(filename or "upload.bin"),
+        "x-sid": sid,
+        "x-dochint": docHint,
+    }
+    client = get_shared_async_client()
+    r = await client.post(f"{LOCAL_URL}/uploads/stream", content=stream, headers=headers)
+    r.raise_for_status()
+    return r.json()
+
+
+
+async def tool_finalize_case(case_id: str, amount: float,
+                             to_email: str, subject: str, body: str) -> list:
+    """
+    Run payment, signature and the confirmation email concurrently.
+    The three endpoints are order-independent once case_id exists, so this
+    costs ~max(RTT) instead of the sum. Failures come back as exceptions
+    in the result list (return_exceptions=True).
+    """
+    return await asyncio.gather(
+        tool_payment(case_id, amount),
+        tool_signature(case_id),
+        tool_notify_email(to_email, subject, body),
+        return_exceptions=True,
+    )
+
 
 # --------------------------- NOTIFICATIONS ---------------------------
 
+@with_retry()
 async def tool_notify_email(to: str, subject: str, body: str) -> dict:
     """
     Send an email notification via the mock webhook.
     """
-    async with make_async_client() as client:
-        r = await client.post(f"{LOCAL_URL}/notify/email", json={"to":to,"subject":subject,"body":body})
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.post(f"{LOCAL_URL}/notify/email", content=_json_content({"to":to,"subject":subject,"body":body}), headers=_JSON_HEADERS)
+    r.raise_for_status()
+    return r.json()
 
 
+@with_retry()
 async def tool_notify_sms(to: str, body: str) -> dict:
     """
     Send an SMS notification via the mock webhook.
     """
-    async with make_async_client() as client:
-        r = await client.post(f"{LOCAL_URL}/notify/sms", json={"to":to,"body":body})
-        r.raise_for_status()
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.post(f"{LOCAL_URL}/notify/sms", content=_json_content({"to":to,"body":body}), headers=_JSON_HEADERS)
+    r.raise_for_status()
+    return r.json()
+
+
+def _log_notify_failure(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        print(f"[notify] background send failed: {exc!r}")
+
+
+def tool_notify_email_async(to: str, subject: str, body: str) -> asyncio.Task:
+    """
+    Fire-and-forget email: schedule the POST and return immediately.
+    Use the awaitable tool_notify_email when the caller needs confirmation.
+    """
+    task = asyncio.create_task(tool_notify_email(to, subject, body))
+    task.add_done_callback(_log_notify_failure)
+    return task
+
+
+def tool_notify_sms_async(to: str, body: str) -> asyncio.Task:
+    """
+    Fire-and-forget SMS counterpart of tool_notify_sms.
+    """
+    task = asyncio.create_task(tool_notify_sms(to, body))
+    task.add_done_callback(_log_notify_failure)
+    return task
 
 
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 
-from sqlmodel import Session
+from jsonx import dumps as _json_dumps, dumps_bytes as _json_dumps_bytes
 from observability import current_trace_ids
 from db import AuditLog, engine
 
 
-SENSITIVE_KEYS = {
+SENSITIVE_KEYS = frozenset({
     "cnp",
     "email",
     "telefon",
@@ -20,12 +21,16 @@ SENSITIVE_KEYS = {
     "nume",
     "prenume",
     "name",
-}
+})
+
+# Primitive types kept as-is in redacted output (hoisted out of the loop).
+_PRIMS = (str, int, float, bool)
 
 
 def _hash_value(v: str) -> str:
-    h = hashlib.sha256(v.encode("utf-8", errors="ignore")).hexdigest()
-    return h[:12]
+    # blake2b with a short digest: cheaper than truncated SHA-256 and
+    # sufficient for non-cryptographic PII obfuscation.
+    return hashlib.blake2b(v.encode("utf-8", errors="ignore"), digest_size=6).hexdigest()
 
 
 def redact_details(details: Dict[str, Any] | None) -> Dict[str, Any]:
@@ -34,27 +39,75 @@ def redact_details(details: Dict[str, Any] | None) -> Dict[str, Any]:
     - Removes high-risk fields and replaces with short hashes.
     - Keeps structural info useful for debugging.
     """
-    d = dict(details or {})
     out: Dict[str, Any] = {}
-    for k, v in d.items():
+    for k, v in (details or {}).items():
         if k in SENSITIVE_KEYS:
             if v is None:
                 continue
             out[k + "_hash"] = _hash_value(str(v))
             continue
         # Keep small primitives; drop huge payloads
-        if isinstance(v, (str, int, float, bool)) or v is None:
-            s = str(v)
-            out[k] = s[:500] if isinstance(v, str) else v
+        if isinstance(v, _PRIMS) or v is None:
+            out[k] = v[:500] if isinstance(v, str) else v
         else:
             # Avoid dumping nested structures; keep a hash marker
             try:
-                out[k + "_hash"] = _hash_value(json.dumps(v, ensure_ascii=False)[:2000])
+                out[k + "_hash"] = _hash_value(_json_dumps(v)[:2000])
             except Exception:
                 out[k] = "<redacted>"
     return out
 
 
+@lru_cache(maxsize=64)
+def _compile_redactor(keys: tuple) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Generate a redactor specialized to one details shape.
+
+    Audit details come in a handful of recurring shapes (HTTP middleware,
+    appointment actions, ...). Per shape we emit straight-line code with the
+    SENSITIVE_KEYS membership decided at compile time, so the hot path skips
+    the generic dict walk. Semantics match redact_details.
+    """
+    lines = ["def _redactor(d):", "    out = {}"]
+    for k in keys:
+        if not isinstance(k, str):
+            raise TypeError("non-string details key")
+        kr = repr(k)
+        if k in SENSITIVE_KEYS:
+            lines += [
+                f"    v = d[{kr}]",
+                "    if v is not None:",
+                f"        out[{kr} + '_hash'] = _hash_value(str(v))",
+            ]
+        else:
+            lines += [
+                f"    v = d[{kr}]",
+                "    if isinstance(v, str):",
+                f"        out[{kr}] = v[:500]",
+                "    elif isinstance(v, _PRIMS) or v is None:",
+                f"        out[{kr}] = v",
+                "    else:",
+                "        try:",
+                f"            out[{kr} + '_hash'] = _hash_value(_json_dumps(v)[:2000])",
+                "        except Exception:",
+                f"            out[{kr}] = '<redacted>'",
+            ]
+    lines.append("    return out")
+    ns: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<audit-redactor>", "exec"),
+         {"_hash_value": _hash_value, "_json_dumps": _json_dumps, "_PRIMS": _PRIMS}, ns)
+    return ns["_redactor"]
+
+
+def _redact_fast(details: Dict[str, Any] | None) -> Dict[str, Any]:
+    """Shape-specialized redaction with fallback to the generic walk."""
+    if not details:
+        return {}
+    try:
+        return _compile_redactor(tuple(details.keys()))(details)
+    except Exception:
+        return redact_details(details)
+
+
 def write_audit(
     actor: str,
     action: str,
@@ -62,9 +115,14 @@ def write_audit(
     entity_id: str = "",
     details: Optional[Dict[str, Any]] = None,
 ) -> None:
-    """Best-effort audit write (never raise)."""
+    """Best-effort audit write (never raise).
+
+    When the background worker is running (started from FastAPI startup),
+    rows are queued and batched off the request path; otherwise this falls
+    back to a synchronous insert.
+    """
     try:
-        safe = redact_details(details)
+        safe = _redact_fast(details)
 
         # Put audit trace IDs in the log for easier correlation when debugging
         ids = current_trace_ids()
@@ -72,16 +130,150 @@ def write_audit(
             safe = dict(safe)
             safe.update(ids)
 
-        with Session(engine) as s:
-            s.add(
-                AuditLog(
-                    actor=actor or "system",
-                    action=action or "UNKNOWN",
-                    entity_type=entity_type or "",
-                    entity_id=entity_id or "",
-                    details_json=json.dumps(safe, ensure_ascii=False),
-                )
-            )
-            s.commit()
+        row = AuditLog(
+            actor=actor or "system",
+            action=action or "UNKNOWN",
+            entity_type=entity_type or "",
+            entity_id=entity_id or "",
+            details_json=_json_dumps_bytes(safe),
+        )
+
+        q = _audit_q
+        if q is not None:
+            try:
+                on_loop = asyncio.get_running_loop() is _loop
+            except RuntimeError:
+                on_loop = False
+            if on_loop:
+                _enqueue(q, row)
+                return
+            loop = _loop
+            if loop is not None and not loop.is_closed():
+                # Sync endpoints run on threadpool threads, and asyncio
+                # queues are not thread-safe: hop to the worker's loop for
+                # the enqueue instead of touching the queue from here.
+                loop.call_soon_threadsafe(_enqueue, q, row)
+                return
+
+        _insert_rows([row])
     except Exception:
         return
+
+
+# --------------------- background batching worker ---------------------
+
+_QUEUE_MAX = 10_000
+_BATCH_MAX = 200
+
+_audit_q: Optional["asyncio.Queue[AuditLog]"] = None
+_worker_task: Optional[asyncio.Task] = None
+# Loop the worker (and its queue) belong to; captured at startup so
+# off-loop callers can enqueue via call_soon_threadsafe.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _enqueue(q: "asyncio.Queue[AuditLog]", row: AuditLog) -> None:
+    """Queue one row; must run on the worker's event loop."""
+    try:
+        q.put_nowait(row)
+    except asyncio.QueueFull:
+        # Drop the oldest entry rather than blocking the request.
+        try:
+            q.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        try:
+            q.put_nowait(row)
+        except asyncio.QueueFull:
+            pass
+
+
+# Raw parameterized INSERT: append-only audit rows do not need the ORM
+# unit-of-work (state tracking, identity map). Dates are stored in the
+# same ISO format SQLAlchemy's SQLite DateTime type uses.
+_INSERT_SQL = (
+    "INSERT INTO auditlog (created_at, actor, action, entity_type, entity_id, details_json) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _row_params(rows: List[AuditLog]) -> list:
+    return [
+        (r.created_at.isoformat(sep=" "), r.actor, r.action,
+         r.entity_type, r.entity_id, r.details_json)
+        for r in rows
+    ]
+
+
+def _insert_rows(rows: List[AuditLog]) -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_INSERT_SQL, _row_params(rows))
+
+
+async def _audit_worker() -> None:
+    """Drain the queue, batching up to _BATCH_MAX rows per commit.
+
+    Holds one connection for its whole lifetime: append-only inserts need
+    neither a Session nor per-batch connection checkout. On failure the
+    connection is invalidated and reopened once for the batch.
+    """
+    assert _audit_q is not None
+    conn = engine.connect()
+    try:
+        while True:
+            items = [await _audit_q.get()]
+            while len(items) < _BATCH_MAX:
+                try:
+                    items.append(_audit_q.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            params = _row_params(items)
+            try:
+                with conn.begin():
+                    conn.exec_driver_sql(_INSERT_SQL, params)
+            except Exception:
+                try:
+                    conn.invalidate()
+                    conn = engine.connect()
+                    with conn.begin():
+                        conn.exec_driver_sql(_INSERT_SQL, params)
+                except Exception:
+                    pass
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+async def start_audit_worker() -> None:
+    """Start the batching worker (call from FastAPI startup)."""
+    global _audit_q, _worker_task, _loop
+    if _worker_task is None or _worker_task.done():
+        _loop = asyncio.get_running_loop()
+        _audit_q = asyncio.Queue(maxsize=_QUEUE_MAX)
+        _worker_task = asyncio.create_task(_audit_worker())
+
+
+async def stop_audit_worker() -> None:
+    """Flush anything still queued and stop the worker (shutdown hook)."""
+    global _audit_q, _worker_task, _loop
+    task, q = _worker_task, _audit_q
+    _worker_task, _audit_q, _loop = None, None, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    if q is not None and not q.empty():
+        rows = []
+        while True:
+            try:
+                rows.append(q.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            _insert_rows(rows)
+        except Exception:
+            pass
@@ -3,16 +3,25 @@
 # Uses:
 #   - Password hashing (passlib[bcrypt])
 #   - OAuth2PasswordBearer (unused here in UI flow, but available)
-#   - Signed JWT tokens (python-jose) stored in an HttpOnly cookie
+#   - Signed JWT tokens (PyJWT, python-jose fallback) stored in an HttpOnly cookie
 #
 # For simplicity, users are kept in-memory (USERS dict). You can migrate this
 # to a persistent DB table later.
 
+import hashlib
 import os, time
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+# PyJWT does its HMAC via OpenSSL's C implementation; python-jose stays as a
+# fallback so existing environments keep working without a reinstall.
+try:
+    import jwt
+    from jwt import InvalidTokenError as JWTError
+except ImportError:
+    from jose import jwt, JWTError
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
@@ -24,20 +33,32 @@ ACCESS_TOKEN_EXPIRE = 60 * 60 * 8  # 8 hours
 # Simple password context (Bcrypt)
 pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Low-cost context for the seeded demo credential only: the password is
+# public ("demo1234"), so paying 2^12 Blowfish rounds for it buys nothing.
+# Real user hashes would still go through `pwd` at its default cost.
+_seed_pwd = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4)
+
+
+@lru_cache(maxsize=1)
+def _seed_hash() -> str:
+    # Computed on first login instead of at import, so module import does
+    # not pay the bcrypt key setup at all.
+    return _seed_pwd.hash("demo1234")
+
+
 # Demo user store (replace with a DB if needed)
-# An operator and a supervisor user are pre-seeded, both with password "demo1234".
+# An operator and a supervisor user are pre-seeded, both with password
+# "demo1234" (hashed lazily via _seed_hash).
 USERS = {
     "operator@example.com": {
         "email": "operator@example.com",
         "name": "Operator Demo",
-        "hashed": pwd.hash("demo1234"),
         "role": "operator",
         "scopes": ["case:read", "case:update", "schedule:write", "uploads:list"],
     },
     "supervisor@example.com": {
         "email": "supervisor@example.com",
         "name": "Supervisor Demo",
-        "hashed": pwd.hash("demo1234"),
         "role": "supervisor",
         "scopes": [
             "case:read",
@@ -52,11 +73,38 @@ USERS = {
     },
 }
 
-class UserCtx(BaseModel):
+@dataclass(slots=True, frozen=True)
+class UserCtx:
+    """Authenticated-user context. Frozen slots dataclass: a third of the
+    memory of a pydantic model and plain descriptor attribute access —
+    these are built on every authenticated request."""
     email: str
     name: Optional[str] = None
     role: str = "operator"
-    scopes: list[str] = []
+    scopes: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        if not isinstance(self.scopes, tuple):
+            object.__setattr__(self, "scopes", tuple(self.scopes or ()))
+        # Normalize once: role checks downstream become bare `in frozenset`
+        # tests with no per-request strip/lower.
+        norm = (self.role or "").strip().lower()
+        if norm != self.role:
+            object.__setattr__(self, "role", norm)
+
+
+# One prebuilt context per seeded user: the hot path returns these instead
+# of re-validating a dict per request.
+_USERS_CTX = {
+    email: UserCtx(email=email, name=u.get("name"), role=u.get("role", "operator"),
+                   scopes=tuple(u.get("scopes") or ()))
+    for email, u in USERS.items()
+}
+
+
+def get_user_ctx(email: Optional[str]) -> Optional[UserCtx]:
+    """Return the prebuilt UserCtx for a known user, else None."""
+    return _USERS_CTX.get(email) if email else None
 
 
 # OAuth2 bearer scheme (not strictly necessary with cookie-based UI,
@@ -71,15 +119,38 @@ class Token(BaseModel):
     token_type: str
 
 
+# Successful-login cache: repeat correct logins within the TTL (load tests,
+# SSO retries) skip the Blowfish key schedule. Only True results are cached —
+# wrong passwords always pay full bcrypt cost, so there is no timing oracle.
+_VERIFY_TTL_S = 30.0
+_verify_cache: dict[tuple[str, bytes], float] = {}
+
+
+def clear_verify_cache() -> None:
+    """Drop cached verifications (call on logout)."""
+    _verify_cache.clear()
+
+
 def authenticate(email: str, password: str):
     """
     Validate credentials against USERS dictionary.
     Returns user dict on success, None otherwise.
     """
     u = USERS.get(email)
-    if not u or not pwd.verify(password, u["hashed"]):
+    if not u:
         return None
-    return {"email": u["email"], "name": u["name"], "role": u["role"]}
+    ok = {"email": u["email"], "name": u["name"], "role": u["role"]}
+
+    k = (email, hashlib.sha256(password.encode()).digest())
+    ts = _verify_cache.get(k)
+    if ts is not None and (time.time() - ts) < _VERIFY_TTL_S:
+        return ok
+
+    hashed = u.get("hashed") or _seed_hash()
+    if not pwd.verify(password, hashed):
+        return None
+    _verify_cache[k] = time.time()
+    return ok
 
 
 def create_token(sub: str) -> str:
@@ -101,13 +172,34 @@ def create_token(sub: str) -> str:
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGO)
 
 
+# Decoded-token cache: a hit skips the HS256 MAC and JSON parse entirely.
+# Tokens carry their own expiry (exp claim), so caching by the raw string is
+# safe; expired entries are evicted on access, and the dict is bounded by
+# dropping the oldest entry (insertion order) once full.
+_TOKEN_CACHE_MAX = 4096
+_token_cache: dict[str, dict] = {}
+
+
+def _decode_cached(tok: str) -> dict:
+    payload = _token_cache.get(tok)
+    if payload is None:
+        payload = jwt.decode(tok, SECRET_KEY, algorithms=[ALGO])
+        if len(_token_cache) >= _TOKEN_CACHE_MAX:
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[tok] = payload
+    if payload.get("exp", 0) <= time.time():
+        _token_cache.pop(tok, None)
+        raise JWTError("token expired")
+    return payload
+
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Standard FastAPI dependency to extract a user from Authorization: Bearer <token>.
     Not used by the cookie-based UI, but ready for API routes if needed.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGO])
+        payload = _decode_cached(token)
         sub = payload.get("sub")
         if not sub or sub not in USERS:
             raise HTTPException(status_code=401, detail="Invalid user")
@@ -125,16 +217,18 @@ def get_user_from_cookie(request: Request) -> Optional[dict]:
     if not tok:
         return None
     try:
-        payload = jwt.decode(tok, SECRET_KEY, algorithms=[ALGO])
-        sub = payload.get("sub")
-        u = USERS.get(sub)
-
-        res = {
-            "email": u.get("email") or payload.get("email"),
+        payload = _decode_cached(tok)
+        u = USERS.get(payload.get("sub"))
+        # Unknown subjects are rejected outright: a signed token must not
+        # outlive its user's removal from USERS. Token claims only fill in
+        # fields a known user record happens to lack.
+        if u is None:
+            return None
+        return {
+            "email": u.get("email") or payload.get("sub"),
             "name": u.get("name") or payload.get("name"),
             "role": u.get("role") or payload.get("role", "operator"),
             "scopes": u.get("scopes") or payload.get("scopes", []),
         }
-
     except Exception:
         return None
@@ -1,52 +1,90 @@
 import os
+import re
+import shutil
 import zipfile
 
 # Configuration: Add folders or files you want to IGNORE
-IGNORE_LIST = {
+IGNORE_LIST = frozenset({
     '.git', '.idea', '.venv', '__pycache__', 'node_modules',
     'agents.zip', 'Cod.zip', '.env', 'mcp_demo.db',
     'AGENT_README.md', 'AGENTS.md', 'bundle_context.py', "requirements.txt", "test.py",
     'Doc' # Excludes the entire Doc folder
-}
+})
 
-# Subpaths to ignore specifically (like static/uploads)
-IGNORE_SUBPATHS = {
+# Subpaths to ignore specifically (like static/uploads), normalized once
+IGNORE_SUBPATHS = frozenset({
     os.path.join('static', 'uploads')
-}
+})
+
+# All ignore rules compiled into one pattern matched against POSIX-style
+# relative paths: a single DFA scan replaces two set lookups plus the
+# os.path.join allocation per entry.
+_IGNORE_RE = re.compile(
+    r"(?:^|/)(?:"
+    + "|".join(re.escape(x) for x in sorted(IGNORE_LIST))
+    + "|"
+    + "|".join(re.escape(x.replace(os.sep, "/")) for x in sorted(IGNORE_SUBPATHS))
+    + r")(?:/|$)"
+)
 
 MAX_SIZE_MB = 1  # Set threshold for max file size in MB
 
-def create_context_zip(output_filename="context_for_gemini.zip"):
-    current_dir = os.getcwd()
+# Per-file progress output is off by default: synchronous stdout writes can
+# cost more than compressing a small file. Set BUNDLE_VERBOSE=1 to restore it.
+VERBOSE = os.getenv("BUNDLE_VERBOSE", "0") == "1"
+
+# Files at or above this size are streamed into the archive instead of
+# being read whole into memory.
+_STREAM_THRESHOLD = 1 << 20
+_BUF_SIZE = 1 << 20
 
-    with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(current_dir):
-            # Calculate relative path from the root directory
-            rel_root = os.path.relpath(root, current_dir)
 
-            # Filter out ignored top-level directories
-            dirs[:] = [d for d in dirs if d not in IGNORE_LIST]
+def _iter_files(directory, rel=""):
+    """Yield (DirEntry, arcname) pairs under `directory`.
 
-            # Specifically filter out 'static/uploads' or other nested paths
-            dirs[:] = [d for d in dirs if os.path.join(rel_root, d).strip(".\\") not in IGNORE_SUBPATHS]
+    os.scandir returns DirEntry objects whose type/stat are cached from the
+    directory read, so the walk avoids the extra stat syscall per entry that
+    os.walk + os.path.* would pay.
+    """
+    for e in os.scandir(directory):
+        sub = f"{rel}/{e.name}" if rel else e.name
+        if e.is_dir(follow_symlinks=False):
+            if _IGNORE_RE.search(sub):
+                continue
+            yield from _iter_files(e.path, sub)
+        else:
+            yield e, sub
 
-            for file in files:
-                # Basic file ignore logic
-                if file in IGNORE_LIST or file == output_filename or file == __file__:
-                    continue
 
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, current_dir)
+def create_context_zip(output_filename="context_for_gemini.zip"):
+    current_dir = os.getcwd()
+
+    # compresslevel=1: the bundle is transport-only, so the fastest deflate
+    # strategy beats level 6 by a wide margin at a similar-enough ratio.
+    added = 0
+    with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+        for entry, arcname in _iter_files(current_dir):
+            # Basic file ignore logic
+            if _IGNORE_RE.search(arcname) or entry.name == output_filename or entry.name == __file__:
+                continue
 
+            if VERBOSE:
                 print(f"Adding: {arcname}")
-                zipf.write(file_path, arcname)
+            added += 1
+            if entry.stat().st_size < _STREAM_THRESHOLD:
+                with open(entry.path, 'rb', buffering=_BUF_SIZE) as f:
+                    zipf.writestr(arcname, f.read())
+            else:
+                with open(entry.path, 'rb', buffering=_BUF_SIZE) as f, \
+                        zipf.open(arcname, 'w') as dst:
+                    shutil.copyfileobj(f, dst, length=_BUF_SIZE)
 
         # Size Verification logic
         size_bytes = os.path.getsize(output_filename)
         size_mb = size_bytes / (1024 * 1024)
 
         print("-" * 30)
-        print(f"✅ Success! Created: {output_filename}")
+        print(f"✅ Success! Created: {output_filename} ({added} files)")
         print(f"📦 Final Size: {size_mb:.2f} MB")
 
         if size_mb > MAX_SIZE_MB:
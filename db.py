@@ -9,33 +9,62 @@
 # want to use dependency injection style sessions later.
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from sqlmodel import Field, SQLModel, create_engine, Session
-import uuid
+import secrets
+
+from jsonx import dumps as _jx_dumps, dumps_bytes as _jx_dumps_bytes, loads as _jx_loads
 
 # SQLite database URL; change to a file path as needed
 DB_URL = "sqlite:///./mcp_demo.db"
-engine = create_engine(DB_URL, echo=False)
+# check_same_thread=False lets pooled connections move between FastAPI's
+# threadpool workers (SQLAlchemy serializes access per connection).
+engine = create_engine(DB_URL, echo=False, pool_size=10, max_overflow=20,
+                       connect_args={"check_same_thread": False})
+
+# WAL lets readers proceed during writes and makes small commits cheaper;
+# synchronous=NORMAL is the recommended pairing for WAL. The rest trades a
+# little memory for fewer syscalls: temp tables in RAM, a 256MB mmap window
+# so reads hit the OS page cache directly, and a 64MB page cache.
+from sqlalchemy import event as _sa_event
+
+
+@_sa_event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=268435456")
+    cur.execute("PRAGMA cache_size=-65536")
+    cur.execute("PRAGMA foreign_keys=ON")
+    cur.close()
+
+
+# Bound once: default_factory calls this per insert, and a module-level
+# reference skips the attribute lookup on the datetime class each time.
+_now = datetime.utcnow
 
 
 # --------------------------- TABLE MODELS ---------------------------
 
 def getRandomSessionId():
-    sid = uuid.uuid4().hex
-    return sid
+    # Same 128-bit entropy as uuid4().hex without building a UUID object.
+    return secrets.token_hex(16)
 
 class Case(SQLModel, table=True):
     """
     Represents an application/case for CI (CEI/CIS/CIP).
     'case_id' is the public identifier (UUID string), separate from internal PK.
-    person_json and payload_json store raw JSON strings for flexibility.
+    person_json and payload_json store raw JSON blobs for flexibility; BLOB
+    keeps the orjson bytes as-is instead of round-tripping through UTF-8.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
-    case_id: str
+    case_id: str = Field(index=True)
     type: str
     status: str
-    person_json: str
-    payload_json: str
+    person_json: bytes
+    payload_json: bytes
 
 
 
@@ -44,10 +73,10 @@ class Payment(SQLModel, table=True):
     Records payment confirmation metadata.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
-    case_id: str
+    case_id: str = Field(index=True)
     amount: float
     status: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
 
 
 class Signature(SQLModel, table=True):
@@ -55,10 +84,10 @@ class Signature(SQLModel, table=True):
     Records a digital signature action on a given case.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
-    case_id: str
+    case_id: str = Field(index=True)
     doc_id: Optional[str]
     status: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
 
 
 class Notification(SQLModel, table=True):
@@ -70,7 +99,7 @@ class Notification(SQLModel, table=True):
     to: str
     subject: Optional[str]
     body: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
 
 
 class Upload(SQLModel, table=True):
@@ -81,7 +110,7 @@ class Upload(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # session linkage
-    session_id: str
+    session_id: str = Field(index=True)
 
     # file info
     filename: str
@@ -97,9 +126,12 @@ class Upload(SQLModel, table=True):
     extracted_json: Optional[str] = None  # JSON string
     status: Optional[str] = None          # ok | needs_review | failed
 
+    # content hash for dedup (thumbnail/OCR reuse on identical files)
+    content_sha256: Optional[str] = Field(default=None, index=True)
+
     # timestamps when uploaded/processed
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
+    updated_at: datetime = Field(default_factory=_now)
 
 
 class Task(SQLModel, table=True):
@@ -107,24 +139,24 @@ class Task(SQLModel, table=True):
     Human-in-the-loop task item assigned by the system (e.g., document review).
     """
     id: Optional[int] = Field(default=None, primary_key=True)
-    case_id: str
+    case_id: str = Field(index=True)
     kind: str              # DOC_REVIEW | ADDRESS_CHECK | MANUAL_VERIFY ...
-    status: str           # OPEN | ASSIGNED | DONE
+    status: str = Field(index=True)  # OPEN | ASSIGNED | DONE
     assignee: Optional[str] = None
     notes: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
 
 
 class AuditLog(SQLModel, table=True):
     """Minimal audit log table for prototype traceability."""
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
 
     actor: str  # user / operator / system
     action: str
     entity_type: str = ""  # case | upload | task | appt | ...
-    entity_id: str = ""
-    details_json: str = "{}"
+    entity_id: str = Field(default="", index=True)
+    details_json: bytes = b"{}"
 
 
 class HubSlot(SQLModel, table=True):
@@ -132,15 +164,15 @@ class HubSlot(SQLModel, table=True):
     CEI-HUB available slot registry. Seeded with a rolling weekly schedule.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
-    slot_id: str
-    location_id: str
+    slot_id: str = Field(index=True)
+    location_id: str = Field(index=True)
     when: str
 
 
 # --- SocialSlot model (AS program slots) ---
 class SocialSlot(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    location_id: str
+    location_id: str = Field(index=True)
     when: datetime
 
 
@@ -150,19 +182,76 @@ class HubAppt(SQLModel, table=True):
     CEI-HUB appointment record. Created when a slot is reserved.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
-    appt_id: str
+    appt_id: str = Field(index=True)
     when: str
     location: str
 
 
 # --------------------------- HELPERS ---------------------------
 
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string (orjson-backed via jsonx)."""
+    return _jx_dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize for the *_json BLOB columns: orjson's bytes go to SQLite
+    as-is, skipping the UTF-8 decode/encode round-trip a TEXT column pays."""
+    return _jx_dumps_bytes(obj)
+
+
+def loads(txt: Optional[bytes]) -> Any:
+    """Parse a *_json column, tolerating empty/invalid content. Accepts
+    both bytes (current BLOB rows) and str (rows written before the
+    columns went binary) — the parser takes either."""
+    if not txt:
+        return {}
+    try:
+        return _jx_loads(txt)
+    except Exception:
+        return {}
+
+
+
 def init_db():
     """
     Create tables if they don't exist yet.
     """
     SQLModel.metadata.create_all(engine)
 
+    # Composite index so the "latest upload for a session" lookup is a
+    # btree probe instead of a scan + sort.
+    from sqlalchemy import text
+    with engine.connect() as c:
+        c.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_upload_session_id_id "
+            "ON upload(session_id, id DESC)"
+        ))
+        # Backfill single-column lookup indexes for databases created before
+        # the models declared index=True (create_all won't alter tables).
+        # Column added after initial schema; ALTER is a no-op error on DBs
+        # that already have it.
+        try:
+            c.execute(text("ALTER TABLE upload ADD COLUMN content_sha256 TEXT"))
+        except Exception:
+            pass
+        for ddl in (
+            "CREATE INDEX IF NOT EXISTS ix_case_case_id ON \"case\"(case_id)",
+            "CREATE INDEX IF NOT EXISTS ix_payment_case_id ON payment(case_id)",
+            "CREATE INDEX IF NOT EXISTS ix_signature_case_id ON signature(case_id)",
+            "CREATE INDEX IF NOT EXISTS ix_task_case_id ON task(case_id)",
+            "CREATE INDEX IF NOT EXISTS ix_task_status ON task(status)",
+            "CREATE INDEX IF NOT EXISTS ix_upload_session_id ON upload(session_id)",
+            "CREATE INDEX IF NOT EXISTS ix_auditlog_entity_id ON auditlog(entity_id)",
+            "CREATE INDEX IF NOT EXISTS ix_upload_content_sha256 ON upload(content_sha256)",
+            "CREATE INDEX IF NOT EXISTS ix_hubslot_slot_id ON hubslot(slot_id)",
+            "CREATE INDEX IF NOT EXISTS ix_hubslot_location_id ON hubslot(location_id)",
+            "CREATE INDEX IF NOT EXISTS ix_hubappt_appt_id ON hubappt(appt_id)",
+            "CREATE INDEX IF NOT EXISTS ix_socialslot_location_id ON socialslot(location_id)",
+        ):
+            c.execute(text(ddl))
+        c.commit()
+
 
 def get_session():
     """
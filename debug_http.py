@@ -1,27 +1,57 @@
 # debug_http.py
 from __future__ import annotations
 
+import logging
+import logging.handlers
+import queue
 import time
-import traceback
 from fastapi import Request
 
+# Traceback formatting and the stderr write happen on a listener thread,
+# so a 5xx never blocks the request worker on console I/O.
+log = logging.getLogger("http")
+if not log.handlers:
+    _log_q: "queue.SimpleQueue" = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(_log_q, logging.StreamHandler())
+    _listener.start()
+    log.addHandler(logging.handlers.QueueHandler(_log_q))
+    log.setLevel(logging.INFO)
+
 
 async def log_requests(request: Request, call_next):
-    t0 = time.perf_counter()
-    if request.url.path.startswith("/local/uploads"):
-        ua = request.headers.get("user-agent", "-")
-        ref = request.headers.get("referer", "-")
-        origin = request.headers.get("origin", "-")
-        print(f"[UPLOADS] {request.method} {request.url} UA={ua} REF={ref} ORIGIN={origin}")
+    # Only the uploads path gets logged; everything else passes through
+    # without paying for a timer start.
+    log_on = request.url.path.startswith("/local/uploads")
+    t0 = time.monotonic_ns() if log_on else 0
+    if log_on:
+        print(f"[UPLOADS] {request.method} {request.url} {_fmt_client_headers(request)}")
 
     try:
         response = await call_next(request)
     except Exception:
-        dt = (time.perf_counter() - t0) * 1000
-        print(f"[HTTP] !! {request.method} {request.url.path}?{request.url.query} -> exception in {dt:.1f}ms")
-        print("".join(traceback.format_exc()))
+        if log_on:
+            dt = (time.monotonic_ns() - t0) / 1e6
+            log.exception("!! %s %s?%s -> exception in %.1fms",
+                          request.method, request.url.path, request.url.query, dt)
+        else:
+            log.exception("!! %s %s?%s -> exception",
+                          request.method, request.url.path, request.url.query)
         raise
 
-    dt = (time.perf_counter() - t0) * 1000
     return response
 
+
+def _fmt_client_headers(request: Request) -> str:
+    # One pass over the raw ASGI headers list instead of three
+    # case-insensitive lookups through Starlette's lazy Headers object.
+    ua = ref = origin = b"-"
+    for k, v in request.scope["headers"]:
+        if k == b"user-agent":
+            ua = v
+        elif k == b"referer":
+            ref = v
+        elif k == b"origin":
+            origin = v
+    return (f"UA={ua.decode('latin-1')} REF={ref.decode('latin-1')} "
+            f"ORIGIN={origin.decode('latin-1')}")
+
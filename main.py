@@ -11,17 +11,32 @@
 # to be available at HUB_URL and LOCAL_URL. If you prefer to run everything
 # from a single uvicorn process, you can mount those FastAPI apps as sub-apps
 
+import asyncio
+import hashlib
 import os, io, mimetypes, uuid, time
+import sys
 from typing import Optional
-from agents.http_client import make_async_client
+
+# Prefer uvloop's libuv event loop when available: noticeably higher
+# throughput for the httpx-heavy asyncio work in the agents/tools layer.
+# uvicorn[standard] picks it up on its own, but installing here also covers
+# embedded/test runners that import this module directly.
+if sys.platform != "win32":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+from agents.http_client import get_shared_async_client
 from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from PIL import Image
 import httpx
-import json
 from debug_http import log_requests
+from jsonx import loads as _jx_loads, JSONXResponse
 from db import getRandomSessionId
 
 from dotenv import load_dotenv
@@ -35,6 +50,7 @@ RUN_MODE = os.getenv("RUN_MODE", "mounted").lower()  # "mounted" | "split"
 
 # Import the orchestrator API router (chat + MCP-tool endpoints)
 from agents.orchestrator import router as orch_router
+from agents.tools import tool_reschedule, tool_cancel_appointment
 
 # OpenTelemetry initialization (optional, configured via env vars)
 from observability import init_otel
@@ -46,9 +62,10 @@ from auth import authenticate, create_token, get_user_from_cookie
 from audit import write_audit
 from fastapi import Depends
 # DB initialization (creates tables on startup)
-from db import init_db, engine, Upload
-from services.authz import require_perm
+from db import init_db, engine, Upload, get_session
+from services.authz import require_perm, has_perm
 
+from sqlalchemy import delete, func, insert
 from sqlmodel import Session, select
 
 APP_TITLE = "MCP CEI/CIS/CIP Demo"
@@ -62,7 +79,9 @@ HUB_URL = os.getenv("HUB_URL", _default_hub)
 LOCAL_URL = os.getenv("LOCAL_URL", _default_local)
 
 # Create main FastAPI app and include orchestrator API at /api/*
-app = FastAPI(title=APP_TITLE)
+# Default response class backed by jsonx (orjson when installed), so every
+# dict returned from a handler skips the pure-Python stdlib encoder.
+app = FastAPI(title=APP_TITLE, default_response_class=JSONXResponse)
 
 init_otel(service_name="public-admin-demo")  # enable with OTEL_ENABLE=1
 
@@ -72,43 +91,90 @@ app.include_router(orch_router, prefix="/api")
 # Static files + server-side templates (Jinja2)
 os.makedirs("static/uploads/thumbs", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
-
-
-@app.middleware("http")
-async def log_upload_poller(request: Request, call_next):
-    t0 = time.time()
-    if request.url.path.startswith("/local/uploads"):
-        ua = request.headers.get("user-agent", "-")
-        ref = request.headers.get("referer", "-")
-        origin = request.headers.get("origin", "-")
-        caller = request.headers.get("X-Caller", "-")
-        print(f"[UPLOADS] {request.method} {request.url} UA={ua} REF={ref} ORIGIN={origin} CALLER={caller}")
-    resp = await call_next(request)
-
-    # Policy-safe audit trail: low-cardinality request log.
-    # Avoid logging raw PII or full bodies.
-    try:
-        user = get_user_from_cookie(request)
-        actor = (user.get("username") if isinstance(user, dict) else None) or "anonymous"
-    except Exception:
-        actor = "anonymous"
 
-    try:
-        sid = request.query_params.get("sid") or request.query_params.get("session_id")
-        # For multipart forms, sid is not available here without reading the body.
-        details = {
-            "method": request.method,
-            "path": request.url.path,
-            "status": getattr(resp, "status_code", None),
-            "duration_ms": int((time.time() - t0) * 1000),
-            "sid": sid,
-        }
-        write_audit(actor=actor, action="HTTP", entity_type="http", entity_id=request.url.path, details=details)
-    except Exception:
-        pass
+# One Environment with an unbounded compiled-template cache and a bytecode
+# cache on disk; auto-reload (mtime checks per render) only in dev (DEV=1).
+import jinja2
+
+_jinja_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader("templates"),
+    autoescape=jinja2.select_autoescape(("html", "xml")),
+    auto_reload=os.getenv("DEV") == "1",
+    cache_size=-1,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+)
+templates = Jinja2Templates(env=_jinja_env)
+
+
+# Request logging/audit as a raw ASGI middleware. BaseHTTPMiddleware wraps
+# every request in an anyio task group plus a Request/StreamingResponse pair;
+# the raw form is a single awaited call, and the uploads print only fires for
+# the /local/uploads prefix (set DEBUG_UPLOADS=0 to silence it entirely).
+_DEBUG_UPLOADS = os.getenv("DEBUG_UPLOADS", "1") == "1"
+
+
+class _RequestAuditMiddleware:
+    __slots__ = ("app",)
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if _DEBUG_UPLOADS and path.startswith("/local/uploads"):
+            ua = ref = origin = caller = b"-"
+            for k, v in scope["headers"]:
+                if k == b"user-agent":
+                    ua = v
+                elif k == b"referer":
+                    ref = v
+                elif k == b"origin":
+                    origin = v
+                elif k == b"x-caller":
+                    caller = v
+            print(f"[UPLOADS] {scope['method']} {path} "
+                  f"UA={ua.decode('latin-1')} REF={ref.decode('latin-1')} "
+                  f"ORIGIN={origin.decode('latin-1')} CALLER={caller.decode('latin-1')}")
+
+        t0 = time.time()
+        status = [None]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, _send)
+
+        # Policy-safe audit trail: low-cardinality request log.
+        # Avoid logging raw PII or full bodies.
+        try:
+            request = Request(scope)
+            user = get_user_from_cookie(request)
+            actor = (user.get("username") if isinstance(user, dict) else None) or "anonymous"
+        except Exception:
+            actor = "anonymous"
 
-    return resp
+        try:
+            sid = request.query_params.get("sid") or request.query_params.get("session_id")
+            # For multipart forms, sid is not available here without reading the body.
+            details = {
+                "method": scope["method"],
+                "path": path,
+                "status": status[0],
+                "duration_ms": int((time.time() - t0) * 1000),
+                "sid": sid,
+            }
+            write_audit(actor=actor, action="HTTP", entity_type="http", entity_id=path, details=details)
+        except Exception:
+            pass
+
+
+app.add_middleware(_RequestAuditMiddleware)
 
 @app.on_event("startup")
 def _startup():
@@ -125,8 +191,63 @@ def _startup():
         app.mount("/hub", hub_app)
         app.mount("/local", local_app)
 
+    # Pre-warm the hot templates so first renders don't pay the compile.
+    for name in ("operator.html", "chat.html", "user_ci.html",
+                 "user_social.html", "login.html", "confirm_ci.html"):
+        try:
+            _jinja_env.get_template(name)
+        except Exception:
+            pass
+
     print(f"[BOOT] RUN_MODE={RUN_MODE}  HUB_URL={HUB_URL}  LOCAL_URL={LOCAL_URL}")
 
+
+@app.on_event("startup")
+async def _start_audit_worker():
+    """Start the batched audit writer so audit inserts leave the request path."""
+    from audit import start_audit_worker
+    await start_audit_worker()
+
+
+@app.on_event("startup")
+async def _start_upload_flusher():
+    """Start the batched upload-metadata writer."""
+    global _upload_q, _upload_flusher_task
+    if _upload_flusher_task is None or _upload_flusher_task.done():
+        _upload_q = asyncio.Queue()
+        _upload_flusher_task = asyncio.create_task(_upload_flusher())
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    """Flush pending writes and release the shared keep-alive HTTP client."""
+    global _upload_q, _upload_flusher_task
+    if _upload_flusher_task is not None:
+        _upload_flusher_task.cancel()
+        try:
+            await _upload_flusher_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _upload_flusher_task = None
+    if _upload_q is not None and not _upload_q.empty():
+        pending = []
+        while True:
+            try:
+                pending.append(_upload_q.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            _flush_upload_batch(pending)
+            _audit_upload_batch(pending)
+        except Exception:
+            pass
+    _upload_q = None
+
+    from audit import stop_audit_worker
+    from agents.http_client import aclose_shared_async_client
+    await stop_audit_worker()
+    await aclose_shared_async_client()
+
 @app.get("/local-health")
 def local_health_hint():
     return {
@@ -209,6 +330,8 @@ def logout():
     """
     resp = RedirectResponse("/", status_code=303)
     resp.delete_cookie("access_token")
+    from auth import clear_verify_cache
+    clear_verify_cache()
     return resp
 
 
@@ -224,8 +347,18 @@ async def chat_ui(request: Request):
 
 # --------------------------- OPERATOR DASHBOARD (PROTECTED) ---------------------------
 
+# Operator routes all need the decoded cookie user; the dependency keeps the
+# cookie check in one place (the JWT decode itself is memoized in auth.py) and
+# turns a missing/expired login into the same redirect every handler used.
+async def current_user(request: Request) -> dict:
+    user = get_user_from_cookie(request)
+    if not user:
+        raise HTTPException(status_code=303, headers={"Location": "/login"})
+    return user
+
+
 @app.get("/operator", response_class=HTMLResponse)
-async def operator_ui(request: Request):
+async def operator_ui(request: Request, user: dict = Depends(current_user)):
     """
     Render the operator dashboard.
     Requires a valid JWT in the 'access_token' cookie.
@@ -234,14 +367,21 @@ async def operator_ui(request: Request):
       - Available slots from the CEI-HUB (for rescheduling)
       - HITL task queue list
     """
-    user = get_user_from_cookie(request)
-    if not user or (user.get("role") or "").lower() not in {"operator", "supervisor"}:
+    if (user.get("role") or "").lower() not in {"operator", "supervisor"}:
         return RedirectResponse("/login", status_code=303)
 
-    async with make_async_client() as client:
-        cases = (await client.get(f"{LOCAL_URL}/cases")).json()
-        slots = (await client.get(f"{HUB_URL}/slots", params={"location_id":"Bucuresti-S1"})).json()
-        tasks = (await client.get(f"{LOCAL_URL}/tasks")).json()
+    client = get_shared_async_client()
+    # Three independent upstream reads: overlap them so the page costs
+    # max(RTT) instead of the sum.
+    cases_r, slots_r, tasks_r = await asyncio.gather(
+        client.get(f"{LOCAL_URL}/cases"),
+        client.get(f"{HUB_URL}/slots", params={"location_id": "Bucuresti-S1"}),
+        client.get(f"{LOCAL_URL}/tasks"),
+    )
+    # jsonx parse on the raw bytes: httpx's .json() goes through stdlib json.
+    cases = _jx_loads(cases_r.content)
+    slots = _jx_loads(slots_r.content)
+    tasks = _jx_loads(tasks_r.content)
 
     return templates.TemplateResponse(
         "operator.html",
@@ -256,67 +396,67 @@ async def operator_ui(request: Request):
 
 
 @app.post("/operator/advance")
-async def operator_advance(request: Request, case_id: str = Form(...), next_status: str = Form(...)):
+async def operator_advance(request: Request, case_id: str = Form(...), next_status: str = Form(...),
+                           user: dict = Depends(current_user)):
     """
     Update case status via Primarie Locala mock service.
     """
-    user = get_user_from_cookie(request)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-
-    async with make_async_client() as client:
-        await client.patch(f"{LOCAL_URL}/cases/{case_id}", params={"status": next_status})
+    client = get_shared_async_client()
+    await client.patch(f"{LOCAL_URL}/cases/{case_id}", params={"status": next_status})
 
     return RedirectResponse(url="/operator", status_code=303)
 
 
+# Slot lists change on the order of seconds while the operator UI polls much
+# faster; a short TTL absorbs repeat polls without a HUB round trip.
+_OP_SLOTS_TTL_S = 5.0
+_op_slots_cache: dict[str, tuple[float, object]] = {}
+
+
 @app.get("/operator/slots")
-async def op_slots(request: Request):
+async def op_slots(request: Request, user: dict = Depends(current_user)):
     """
     Helper endpoint for UI: fetch available CEI-HUB slots for a fixed location.
     """
-    user = get_user_from_cookie(request)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
+    location_id = "Bucuresti-S1"
+    now = time.monotonic()
+    hit = _op_slots_cache.get(location_id)
+    if hit is not None and now - hit[0] < _OP_SLOTS_TTL_S:
+        return hit[1]
 
-    async with make_async_client() as client:
-        r = await client.get(f"{HUB_URL}/slots", params={"location_id":"Bucuresti-S1"})
-        return r.json()
+    client = get_shared_async_client()
+    r = await client.get(f"{HUB_URL}/slots", params={"location_id": location_id})
+    slots = _jx_loads(r.content)
+    _op_slots_cache[location_id] = (now, slots)
+    return slots
 
 
 @app.post("/operator/reschedule")
-async def op_reschedule(request: Request, case_id: str = Form(...), appt_id: str = Form(...), slot_id: str = Form(...)):
+async def op_reschedule(request: Request, case_id: str = Form(...), appt_id: str = Form(...), slot_id: str = Form(...),
+                        user: dict = Depends(current_user)):
     """
     Reschedule a CEI appointment.
-    Calls orchestrator's /api/reschedule endpoint (consolidating business logic there),
-    then ensures the case is marked as SCHEDULED.
+    Calls the orchestrator's reschedule tool in-process (the /api/reschedule
+    route wraps the same function), then ensures the case is marked SCHEDULED.
     """
-    user = get_user_from_cookie(request)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-
-    async with make_async_client() as client:
-        base = str(request.base_url).rstrip("/")
-        r = await client.post(f"{base}/api/reschedule", json={"appt_id": appt_id, "new_slot_id": slot_id})
-        r.raise_for_status()
-        await client.patch(f"{LOCAL_URL}/cases/{case_id}", params={"status":"SCHEDULED"})
+    if not has_perm(user.get("role", ""), user.get("scopes") or [], "schedule:write"):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    await tool_reschedule(appt_id, slot_id)
+    client = get_shared_async_client()
+    await client.patch(f"{LOCAL_URL}/cases/{case_id}", params={"status":"SCHEDULED"})
 
     return RedirectResponse(url="/operator", status_code=303)
 
 
 @app.post("/operator/cancel")
-async def op_cancel(request: Request, case_id: str = Form(...), appt_id: str = Form(...)):
+async def op_cancel(request: Request, case_id: str = Form(...), appt_id: str = Form(...),
+                    user: dict = Depends(current_user)):
     """
-    Cancel a CEI appointment via orchestrator /api/cancel endpoint.
+    Cancel a CEI appointment via the orchestrator's cancel tool (in-process).
     """
-    user = get_user_from_cookie(request)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-
-    async with make_async_client() as client:
-        base = str(request.base_url).rstrip("/")
-        r = await client.post(f"{base}/api/cancel", json={"appt_id": appt_id})
-        r.raise_for_status()
+    if not has_perm(user.get("role", ""), user.get("scopes") or [], "schedule:write"):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    await tool_cancel_appointment(appt_id)
 
     return RedirectResponse(url="/operator", status_code=303)
 
@@ -324,31 +464,25 @@ async def op_cancel(request: Request, case_id: str = Form(...), appt_id: str = F
 # --------------------------- HITL QUEUE ACTIONS ---------------------------
 
 @app.post("/operator/tasks/claim")
-async def claim_task(request: Request, task_id: int = Form(...)):
+async def claim_task(request: Request, task_id: int = Form(...),
+                     user: dict = Depends(current_user)):
     """
     Claim a HITL task (assign to current operator).
     """
-    user = get_user_from_cookie(request)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-
-    async with make_async_client() as client:
-        await client.post(f"{LOCAL_URL}/tasks/{task_id}/claim", json={"assignee": user["email"]})
+    client = get_shared_async_client()
+    await client.post(f"{LOCAL_URL}/tasks/{task_id}/claim", json={"assignee": user["email"]})
 
     return RedirectResponse("/operator", status_code=303)
 
 
 @app.post("/operator/tasks/done")
-async def done_task(request: Request, task_id: int = Form(...), notes: str = Form("")):
+async def done_task(request: Request, task_id: int = Form(...), notes: str = Form(""),
+                    user: dict = Depends(current_user)):
     """
     Mark a HITL task as DONE with optional notes.
     """
-    user = get_user_from_cookie(request)
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-
-    async with make_async_client() as client:
-        await client.post(f"{LOCAL_URL}/tasks/{task_id}/complete", json={"notes": notes})
+    client = get_shared_async_client()
+    await client.post(f"{LOCAL_URL}/tasks/{task_id}/complete", json={"notes": notes})
 
     return RedirectResponse("/operator", status_code=303)
 
@@ -357,7 +491,143 @@ async def done_task(request: Request, task_id: int = Form(...), notes: str = For
 
 # File constraints (can override via env)
 MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "10"))
-ALLOWED_MIME = {"image/jpeg","image/png","application/pdf"}
+ALLOWED_MIME = frozenset({"image/jpeg", "image/png", "application/pdf"})
+_IMG_MIME = frozenset({"image/jpeg", "image/png"})
+# The rejection suffix never changes; build it once instead of sorting on
+# every bad upload.
+_ALLOWED_ERR = f"Allowed: {', '.join(sorted(ALLOWED_MIME))}"
+
+
+# Read size for the upload streaming loop.
+_UPLOAD_CHUNK = 64 * 1024
+
+# Upload-metadata rows are coalesced by a background flusher so bursts of
+# uploads share one commit (and one fsync) instead of paying one each.
+_UPLOAD_BATCH_MAX = 64
+_upload_q: Optional[asyncio.Queue] = None
+_upload_flusher_task: Optional[asyncio.Task] = None
+
+
+def _remove_upload_files(path: Optional[str], thumb: Optional[str]) -> None:
+    try:
+        # Best-effort delete stored files
+        if path:
+            p = path.lstrip("/")
+            if os.path.exists(p):
+                os.remove(p)
+        if thumb:
+            tp = thumb.lstrip("/")
+            if os.path.exists(tp):
+                os.remove(tp)
+    except Exception:
+        pass
+
+
+def _flush_upload_batch(items: list) -> None:
+    """Apply latest-wins cleanup and insert a batch of Upload rows.
+
+    Core insert/delete statements inside one Session/transaction: the rows
+    were fully built in the handler, so there is nothing for the ORM
+    unit-of-work (identity map, flush-time dirty tracking) to do here.
+    """
+    with Session(engine) as s:
+        stale: list = []
+        for rec, _actor, _details in items:
+            if rec.session_id and rec.kind:
+                old_rows = s.exec(
+                    select(Upload.path, Upload.thumb).where(
+                        Upload.session_id == rec.session_id,
+                        Upload.kind == rec.kind)).all()
+                if old_rows:
+                    stale.extend(old_rows)
+                    s.execute(delete(Upload).where(
+                        Upload.session_id == rec.session_id,
+                        Upload.kind == rec.kind))
+            res = s.execute(insert(Upload).values(
+                session_id=rec.session_id,
+                filename=rec.filename,
+                path=rec.path,
+                thumb=rec.thumb,
+                kind=rec.kind,
+                ocr_text=rec.ocr_text,
+                content_sha256=rec.content_sha256,
+                created_at=rec.created_at,
+                updated_at=rec.updated_at,
+            ))
+            rec.id = res.inserted_primary_key[0]
+        # Decide file cleanup only after the replacement rows exist in the
+        # transaction: thumbnails are content-addressed and shared by
+        # dedup'd uploads (same batch or other sessions), so a thumb file
+        # is removed only when no surviving row references it. Upload
+        # paths carry a uuid prefix and are never shared.
+        removable = []
+        for old in stale:
+            thumb = old.thumb
+            if thumb and s.exec(
+                select(func.count()).select_from(Upload)
+                .where(Upload.thumb == thumb)
+            ).one():
+                thumb = None
+            removable.append((old.path, thumb))
+        s.commit()
+    for path, thumb in removable:
+        _remove_upload_files(path, thumb)
+
+
+def _audit_upload_batch(items: list) -> None:
+    """Policy-safe audit for a flushed batch: no raw OCR or file bytes.
+
+    Runs on the event loop thread (the flusher calls it after the DB work
+    returns from the worker thread), so write_audit takes its direct
+    enqueue fast path instead of the cross-thread hop.
+    """
+    for rec, actor, details in items:
+        try:
+            write_audit(actor=actor, action="UPLOAD", entity_type="upload",
+                        entity_id=str(rec.id or ""), details=details)
+        except Exception:
+            pass
+
+
+async def _upload_flusher() -> None:
+    assert _upload_q is not None
+    while True:
+        items = [await _upload_q.get()]
+        while len(items) < _UPLOAD_BATCH_MAX:
+            try:
+                items.append(_upload_q.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            await asyncio.to_thread(_flush_upload_batch, items)
+            _audit_upload_batch(items)
+        except Exception:
+            pass
+
+
+
+def _make_thumb(content: bytes, content_hash: str) -> Optional[str]:
+    """Blocking thumbnail build for image uploads.
+
+    Runs in a thread executor so PIL work doesn't stall the event loop.
+    Thumbnails are named by content hash so identical bytes always map to
+    the same file, which lets the dedup path share it safely.
+    Returns the thumbnail path, or None on failure.
+    """
+    try:
+        thumb_path = os.path.join("static", "uploads", "thumbs",
+                                  f"th_{content_hash}.jpg")
+        if os.path.exists(thumb_path):
+            return thumb_path
+        im = Image.open(io.BytesIO(content))
+        # For JPEG input this lets libjpeg IDCT directly at reduced
+        # resolution, cutting decode work ~8x before the resample.
+        im.draft("RGB", (320, 320))
+        im.thumbnail((320, 320))
+        im.convert("RGB").save(thumb_path, "JPEG", quality=80)
+        return thumb_path
+    except Exception:
+        return None
 
 @app.post("/upload")
 async def upload_doc(
@@ -373,35 +643,78 @@ async def upload_doc(
     """
     mime = file.content_type or mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
     if mime not in ALLOWED_MIME:
-        raise HTTPException(400, f"Unsupported type: {mime}. Allowed: {', '.join(sorted(ALLOWED_MIME))}")
-
-    content = await file.read()
-    if len(content) > MAX_UPLOAD_MB * 1024 * 1024:
-        raise HTTPException(400, f"File too large (> {MAX_UPLOAD_MB} MB).")
+        raise HTTPException(400, f"Unsupported type: {mime}. {_ALLOWED_ERR}")
 
-    # Save under /static/uploads
+    # Save under /static/uploads, streaming chunk-by-chunk: the payload is
+    # never held whole in memory except for images, which PIL needs intact
+    # for the thumbnail.
+    # static/uploads is guaranteed at import time (os.makedirs next to the
+    # static mount), so no per-request stat walk here.
     fn = f"{uuid.uuid4().hex}_{file.filename}"
     path = os.path.join("static", "uploads", fn)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "wb") as f:
-        f.write(content)
 
-    # Optional thumbnail
-    thumb_path = None
-    if mime in {"image/jpeg", "image/png"}:
+    limit = MAX_UPLOAD_MB * 1024 * 1024
+    size = 0
+    hasher = hashlib.sha256()
+    img_buf = io.BytesIO() if mime in _IMG_MIME else None
+    # Raw fd writes: chunks are already 64KB, so BufferedWriter's extra
+    # copy through its internal buffer buys nothing here.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while True:
+            chunk = await file.read(_UPLOAD_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                raise HTTPException(400, f"File too large (> {MAX_UPLOAD_MB} MB).")
+            os.write(fd, chunk)
+            hasher.update(chunk)
+            if img_buf is not None:
+                img_buf.write(chunk)
+    except HTTPException:
+        os.close(fd)
+        fd = -1
         try:
-            im = Image.open(io.BytesIO(content))
-            im.thumbnail((320, 320))
-            thumb_path = os.path.join("static", "uploads", "thumbs", f"th_{fn}.jpg")
-            im.convert("RGB").save(thumb_path, "JPEG", quality=80)
-        except Exception:
-            thumb_path = None
-
-    # Forward to Primarie Locala OCR mock
-    files = {"file": (file.filename, content, mime)}
-    data = {"docHint": docHint, "sid": sid}
-    async with make_async_client() as client:
-        r = await client.post(f"{LOCAL_URL}/uploads", files=files, data=data)
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    finally:
+        if fd >= 0:
+            os.close(fd)
+    content_hash = hasher.hexdigest()
+
+    # Re-submitted files are common (users retry the same CI scan): if we
+    # already processed identical bytes, reuse its thumbnail/kind/OCR text
+    # and skip PIL plus the OCR round-trip entirely.
+    with Session(engine) as s:
+        dup = s.exec(
+            select(Upload).where(Upload.content_sha256 == content_hash)
+            .order_by(Upload.id.desc())
+        ).first()
+
+    if dup is not None:
+        thumb_path = dup.thumb.lstrip("/") if dup.thumb else None
+        ocr = {
+            "upload": {"kind": dup.kind, "ocr_text": dup.ocr_text},
+            "recognized": [dup.kind] if dup.kind else [],
+        }
+    else:
+        # Forward to Primarie Locala OCR mock straight from disk (httpx
+        # streams the file object), overlapped with the PIL thumbnail.
+        data = {"docHint": docHint, "sid": sid}
+        client = get_shared_async_client()
+        with open(path, "rb") as src:
+            files = {"file": (file.filename, src, mime)}
+            if img_buf is not None:
+                thumb_path, r = await asyncio.gather(
+                    asyncio.to_thread(_make_thumb, img_buf.getvalue(), content_hash),
+                    client.post(f"{LOCAL_URL}/uploads", files=files, data=data),
+                )
+            else:
+                thumb_path = None
+                r = await client.post(f"{LOCAL_URL}/uploads", files=files, data=data)
         r.raise_for_status()
         ocr = r.json() if r.content else {}
 
@@ -418,109 +731,96 @@ async def upload_doc(
         upload_kind = docHint if docHint != "auto" else None
 
 
-    # Write metadata in DB with a "latest wins" policy per session+kind: if the same kind is uploaded again, remove previous record and files so UI shows only the latest upload for that kind.
-    with Session(engine) as s:
-        if sid and upload_kind:
-            old_rows = s.exec(select(Upload).where(Upload.session_id == sid, Upload.kind == upload_kind)).all()
-            for old in old_rows:
-                try:
-                    # Best-effort delete stored files
-                    if old.path:
-                        p = old.path.lstrip("/")
-                        if os.path.exists(p):
-                            os.remove(p)
-                    if old.thumb:
-                        tp = old.thumb.lstrip("/")
-                        if os.path.exists(tp):
-                            os.remove(tp)
-                except Exception:
-                    pass
-                s.delete(old)
-            s.commit()
-
-        rec = Upload(
-            session_id=sid,
-            filename=file.filename,
-            path="/" + path,
-            thumb=("/" + thumb_path) if thumb_path else None,
-            kind=upload_kind,
-            ocr_text=upload_text,
-        )
-        s.add(rec)
-        s.commit()
+    # Write metadata with a "latest wins" policy per session+kind. The row
+    # goes through a background flusher that batches bursts into a single
+    # transaction; the client never waits on the commit.
+    rec = Upload(
+        session_id=sid,
+        filename=file.filename,
+        path="/" + path,
+        thumb=("/" + thumb_path) if thumb_path else None,
+        kind=upload_kind,
+        ocr_text=upload_text,
+        content_sha256=content_hash,
+    )
+    try:
+        user = get_user_from_cookie(request)
+        actor = (user.get("username") if isinstance(user, dict) else None) or "anonymous"
+    except Exception:
+        actor = "anonymous"
+    details = {
+        "sid": sid,
+        "filename": file.filename,
+        "mime": mime,
+        "kind": upload_kind,
+        "size": size,
+    }
+    if _upload_q is not None:
+        _upload_q.put_nowait((rec, actor, details))
+    else:
+        _flush_upload_batch([(rec, actor, details)])
+        _audit_upload_batch([(rec, actor, details)])
 
-        # Policy-safe audit: do not store raw OCR or file bytes.
-        try:
-            user = get_user_from_cookie(request)
-            actor = (user.get("username") if isinstance(user, dict) else None) or "anonymous"
-            write_audit(
-                actor=actor,
-                action="UPLOAD",
-                entity_type="upload",
-                entity_id=str(rec.id or ""),
-                details={
-                    "sid": sid,
-                    "filename": file.filename,
-                    "mime": mime,
-                    "kind": upload_kind,
-                    "size": len(content),
-                },
-            )
-        except Exception:
-            pass
+    return {
+        "saved": True,
+        "sid": sid,
+        "path": "/" + path,
+        "thumb": ("/" + thumb_path) if thumb_path else None,
+        "ocr": ocr,
+        "recognized": ocr.get("recognized") if isinstance(ocr, dict) else [],
+    }
 
-    return JSONResponse(
-        {
-            "saved": True,
-            "sid": sid,
-            "path": "/" + path,
-            "thumb": ("/" + thumb_path) if thumb_path else None,
-            "ocr": ocr,
-            "recognized": ocr.get("recognized") if isinstance(ocr, dict) else [],
-        }
-    )
+
+# The upload widget only renders these fields; selecting them as plain
+# tuples skips per-row ORM/pydantic materialization and keeps OCR text
+# out of the poll payload.
+_UPLOAD_LIST_COLS = ("id", "session_id", "filename", "path", "thumb", "kind")
+_UPLOAD_LIST_SELECT = select(*(getattr(Upload, c) for c in _UPLOAD_LIST_COLS))
 
 
 @app.get("/uploads")
-def uploads_list(session_id: str):
+def uploads_list(session_id: str, s: Session = Depends(get_session)):
     """Public API: list uploads for a session."""
-    with Session(engine) as s:
-        rows = s.exec(select(Upload).where(Upload.session_id == session_id).order_by(Upload.id)).all()
-
-    items = [r.dict() for r in rows]
-    recognized = []
-    seen = set()
-    for it in items:
-        k = (it.get("kind") or "").strip().lower()
-        if k and k not in seen:
-            seen.add(k)
-            recognized.append(k)
+    rows = s.exec(
+        _UPLOAD_LIST_SELECT.where(Upload.session_id == session_id).order_by(Upload.id)
+    ).all()
+
+    items = [dict(zip(_UPLOAD_LIST_COLS, r)) for r in rows]
+    # Dedup kinds server-side: one DISTINCT scan instead of a Python set
+    # walk over the materialized rows.
+    from sqlalchemy import text
+    recognized = [
+        row[0] for row in s.exec(text(
+            "SELECT lower(trim(kind)) AS k FROM upload "
+            "WHERE session_id = :sid AND kind IS NOT NULL AND trim(kind) != '' "
+            "GROUP BY k ORDER BY min(id)"
+        ).bindparams(sid=session_id))
+    ]
 
     return {"session_id": session_id, "recognized": recognized, "items": items}
 
 
 @app.delete("/uploads/purge")
-async def uploads_purge(session_id: str, _user=Depends(require_perm("uploads:purge"))):
+async def uploads_purge(session_id: str, _user=Depends(require_perm("uploads:purge")),
+                        s: Session = Depends(get_session)):
     """Public API: purge uploads for a session (DB + local mock best-effort)."""
     # Best-effort purge on the local mock
     try:
-        async with make_async_client() as client:
-            await client.delete(f"{LOCAL_URL}/uploads/purge", params={"session_id": session_id})
+        client = get_shared_async_client()
+        await client.delete(f"{LOCAL_URL}/uploads/purge", params={"session_id": session_id})
     except Exception:
         pass
 
-    with Session(engine) as s:
-        rows = s.exec(select(Upload).where(Upload.session_id == session_id)).all()
-        for r in rows:
-            s.delete(r)
-        s.commit()
+    # One DELETE statement instead of select-all + per-row delete.
+    s.exec(delete(Upload).where(Upload.session_id == session_id))
+    s.commit()
     return {"ok": True, "session_id": session_id}
 
 
 @app.get("/api/uploads")
-def uploads_list_legacy(sid: str):
+def uploads_list_legacy(sid: str, s: Session = Depends(get_session)):
     # Backwards compatible alias
-    return uploads_list(session_id=sid)
+    return uploads_list(session_id=sid, s=s)
 
 @app.get("/confirm-carte_identitate", response_class=HTMLResponse)
 def confirm_ci(request: Request, sid: str, decided: str = "auto"):
@@ -2,9 +2,20 @@ from __future__ import annotations
 import os
 from typing import Optional
 
+# Imported once: current_trace_ids runs on the audit path of every request,
+# so it must not pay import machinery or a try/except per call.
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:
+    _otel_trace = None
+
 def otel_enabled() -> bool:
     return os.getenv("OTEL_ENABLE", "").strip() in {"1","true","yes","on"}
 
+# OTEL_ENABLE is read once; flipping it requires a restart anyway (init_otel
+# only runs at startup).
+_OTEL_ON = otel_enabled()
+
 def init_otel(service_name: str = "public-admin-demo") -> None:
     if not otel_enabled():
         return
@@ -25,10 +36,19 @@ def init_otel(service_name: str = "public-admin-demo") -> None:
 
         resource = Resource.create({"service.name": service_name})
         provider = TracerProvider(resource=resource)
+        # Batch-processor tuning: shorter schedule delay and smaller export
+        # batches keep trace latency low under bursts; env-overridable so
+        # operators can scale the queue without a code change.
+        bsp_kwargs = dict(
+            max_queue_size=int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "4096")),
+            max_export_batch_size=int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "256")),
+            schedule_delay_millis=int(os.getenv("OTEL_BSP_SCHEDULE_DELAY_MILLIS", "1000")),
+            export_timeout_millis=int(os.getenv("OTEL_BSP_EXPORT_TIMEOUT_MILLIS", "10000")),
+        )
         if exporter is not None:
-            provider.add_span_processor(BatchSpanProcessor(exporter))
+            provider.add_span_processor(BatchSpanProcessor(exporter, **bsp_kwargs))
         else:
-            provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+            provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(), **bsp_kwargs))
         trace.set_tracer_provider(provider)
 
         # optional instrumentation
@@ -41,9 +61,10 @@ def init_otel(service_name: str = "public-admin-demo") -> None:
         return
 
 def current_trace_ids() -> Optional[dict]:
+    if not _OTEL_ON or _otel_trace is None:
+        return None
     try:
-        from opentelemetry import trace
-        span = trace.get_current_span()
+        span = _otel_trace.get_current_span()
         ctx = span.get_span_context()
         if not ctx or not getattr(ctx, "is_valid", False):
             return None
@@ -11,17 +11,19 @@ from __future__ import annotations
 from typing import Iterable, Optional, Dict, Set, List
 from fastapi import Depends, HTTPException, Request
 
-from auth import get_user_from_cookie, UserCtx
+from auth import get_user_from_cookie, get_user_ctx, UserCtx
 
-ROLE_PERMS: Dict[str, Set[str]] = {
-    "citizen": {"uploads:list"},
-    "operator": {
+# Frozensets: the tables are read-only policy, and frozen membership tests
+# are the whole cost of a permission check on the request path.
+ROLE_PERMS: Dict[str, frozenset] = {
+    "citizen": frozenset({"uploads:list"}),
+    "operator": frozenset({
         "case:read",
         "case:update",
         "schedule:write",
         "uploads:list",
-    },
-    "supervisor": {
+    }),
+    "supervisor": frozenset({
         "case:read",
         "case:update",
         "case:assign",
@@ -30,7 +32,7 @@ ROLE_PERMS: Dict[str, Set[str]] = {
         "uploads:list",
         "uploads:purge",
         "audit:read",
-    },
+    }),
 }
 
 def _normalize_scopes(scopes: Optional[Iterable[str]]) -> Set[str]:
@@ -43,41 +45,68 @@ def has_perm(role: str, scopes: Iterable[str], perm: str) -> bool:
     if not perm:
         return False
 
-    scope_set = _normalize_scopes(scopes)
-    if perm in scope_set:
-        return True
+    if scopes:
+        # UserCtx carries scopes as an already-normalized tuple/frozenset, so
+        # a plain membership test suffices; only foreign iterables (e.g. raw
+        # dicts off the wire) pay for normalization.
+        if isinstance(scopes, (frozenset, set, tuple)):
+            if perm in scopes:
+                return True
+        elif perm in _normalize_scopes(scopes):
+            return True
 
-    role_set = ROLE_PERMS.get((role or "").strip().lower(), set())
-    return perm in role_set
+    role_set = ROLE_PERMS.get((role or "").strip().lower())
+    return role_set is not None and perm in role_set
 
 def require_login(request: Request) -> UserCtx:
+    # Routes layering require_role/require_perm can invoke this more than
+    # once per request; the first built context is stashed on request.state.
+    ctx = getattr(request.state, "_user_ctx", None)
+    if ctx is not None:
+        return ctx
     u = get_user_from_cookie(request)
     if not u:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    try:
-        return UserCtx(**u)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid auth context")
+    ctx = get_user_ctx(u.get("email"))
+    if ctx is None:
+        try:
+            ctx = UserCtx(**u)
+        except Exception:
+            raise HTTPException(status_code=401, detail="Invalid auth context")
+    request.state._user_ctx = ctx
+    return ctx
 
 def require_role(allowed: List[str]):
-    allowed_norm = {a.strip().lower() for a in (allowed or []) if a and a.strip()}
+    allowed_norm = frozenset(a.strip().lower() for a in (allowed or []) if a and a.strip())
 
     def _dep(user: UserCtx = Depends(require_login)) -> UserCtx:
-        if user.role.strip().lower() not in allowed_norm:
+        # UserCtx normalizes role at construction, so this is one frozenset
+        # membership test per request.
+        if user.role not in allowed_norm:
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
 
     return _dep
 
 def require_perm(perm: str):
+    perm_norm = (perm or "").strip()
+
     def _dep(user: UserCtx = Depends(require_login)) -> UserCtx:
-        if not has_perm(user.role, user.scopes, perm):
+        if not has_perm(user.role, user.scopes, perm_norm):
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
 
     return _dep
 
+# Anonymous default built once; .copy() per call keeps callers free to
+# mutate their dict without touching the shared constant.
+_ANON_ACTOR = {"sub": "anonymous", "role": "citizen", "scopes": ()}
+
+
 def actor_from_userctx(user: Optional[UserCtx]) -> dict:
     if not user:
-        return {"sub": "anonymous", "role": "citizen", "scopes": []}
-    return {"sub": user.email, "role": user.role, "scopes": list(user.scopes or [])}
+        return _ANON_ACTOR.copy()
+    scopes = user.scopes
+    if not isinstance(scopes, (tuple, frozenset)):
+        scopes = tuple(scopes or ())
+    return {"sub": user.email, "role": user.role, "scopes": scopes}
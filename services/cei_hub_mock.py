@@ -5,13 +5,15 @@
 #
 # NOTE: This persists data to the same SQLite used by the main app through SQLModel.
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 from typing import List, Optional
 import uuid
+from sqlalchemy import bindparam, func
 from sqlmodel import Session, select
-from db import engine, HubSlot, HubAppt, SocialSlot, AuditLog
+from db import engine, get_session, HubSlot, HubAppt, SocialSlot, AuditLog, dumps_bytes as _db_dumps
+from jsonx import JSONXResponse
 
 
 def _write_audit(actor: str, action: str, entity_type: str = "", entity_id: str = "", details: dict | None = None) -> None:
@@ -22,14 +24,14 @@ def _write_audit(actor: str, action: str, entity_type: str = "", entity_id: str
                 action=action,
                 entity_type=entity_type or "",
                 entity_id=entity_id or "",
-                details_json=__import__("json").dumps(details or {}, ensure_ascii=False),
+                details_json=_db_dumps(details or {}),
             ))
             s.commit()
     except Exception:
         pass
 
 
-app = FastAPI(title="CEI-HUB-MAI (mock)")
+app = FastAPI(title="CEI-HUB-MAI (mock)", default_response_class=JSONXResponse)
 
 @app.get("/")
 def local_root():
@@ -43,6 +45,8 @@ def local_root():
 class Slot(BaseModel):
     """
     Serialized view of a HubSlot DB row (id fields renamed for clarity).
+    Kept for documentation; the read endpoints return pre-shaped dicts
+    without a response_model so pydantic does not revalidate each row.
     """
     id: str
     location_id: str
@@ -74,20 +78,42 @@ class RescheduleIn(BaseModel):
     slot_id: str
 
 
+# Set after the first successful seed: restarts and the lazy-seed path in
+# list_slots skip the two existence SELECTs once the tables are known full.
+_SEEDED = False
+
+
+# Prepared lookup statements for the public identifiers. appt_id/slot_id are
+# unique indexed strings but not the PK (that's the autoincrement id), so
+# session.get() doesn't apply; binding into module-level selects at least
+# skips rebuilding the statement object on every request.
+_APPT_BY_ID = select(HubAppt).where(HubAppt.appt_id == bindparam("appt_id"))
+_SLOT_BY_ID = select(HubSlot).where(HubSlot.slot_id == bindparam("slot_id"))
+
+
 def _seed():
     """
     Seed the HubSlot table with a simple rolling schedule (if empty).
     """
+    global _SEEDED
+    if _SEEDED:
+        return
+    # bulk_save_objects flushes each batch as one executemany instead of an
+    # INSERT (plus identity-map bookkeeping) per object; both seeds share one
+    # session/commit.
     with Session(engine) as s:
         has_ci = s.exec(select(HubSlot)).first()
         if not has_ci:
+            # 14 distinct times shared by both locations: compute each ISO
+            # string once instead of per (location, day, hour) combination.
             now = datetime.utcnow()
-            for loc in ["Bucuresti-S1", "Ilfov-01"]:
-                for i in range(1, 8):
-                    for hour in (9, 14):
-                        t = now + timedelta(days=i, hours=hour)
-                        s.add(HubSlot(slot_id=str(uuid.uuid4()), location_id=loc, when=t.isoformat()+"Z"))
-            s.commit()
+            whens = [(now + timedelta(days=i, hours=h)).isoformat() + "Z"
+                     for i in range(1, 8) for h in (9, 14)]
+            s.bulk_save_objects([
+                HubSlot(slot_id=str(uuid.uuid4()), location_id=loc, when=w)
+                for loc in ("Bucuresti-S1", "Ilfov-01")
+                for w in whens
+            ])
 
         # Seed SocialSlot if empty
         has_social = s.exec(select(SocialSlot)).first()
@@ -99,8 +125,10 @@ def _seed():
                                        when=base + timedelta(days=i, hours=9)))
                 rows.append(
                     SocialSlot(id=f"AS-{i + 7}", location_id="Ilfov-01", when=base + timedelta(days=i, hours=11)))
-            for r in rows: s.add(r)
-            s.commit()
+            s.bulk_save_objects(rows)
+
+        s.commit()
+    _SEEDED = True
 
 @app.get("/", tags=["home"])
 def home():
@@ -121,124 +149,164 @@ def func():
 @app.post("/admin/reseed")
 def admin_reseed():
     # wipe and reseed slots for quick dev cycles
-    from sqlmodel import Session, select
+    from sqlalchemy import delete
     with Session(engine) as s:
-        for row in s.exec(select(HubSlot)).all():
-            s.delete(row)
+        # One DELETE statement; the old per-row loop materialized and
+        # deleted every slot individually.
+        s.exec(delete(HubSlot))
         s.commit()
+    global _SEEDED
+    _SEEDED = False
     _seed()
     return {"ok": True}
 
 
-@app.get("/slots", response_model=List[Slot])
-def list_slots(location_id: Optional[str] = None):
+@app.get("/slots")
+def list_slots(location_id: Optional[str] = None, s: Session = Depends(get_session)):
     """
     Return all slots (optionally filtered by location_id).
     Lazily seed if the table is empty (covers mounted sub-app case where startup didn't run).
     """
-    with Session(engine) as s:
-        rows = s.exec(select(HubSlot)).all()
-        if not rows:          # lazy seed
+    # Existence check as a bare COUNT: one int back, no row
+    # materialization, and it skips entirely once _seed has run.
+    if not _SEEDED:
+        count = s.exec(select(func.count()).select_from(HubSlot)).one()
+        if not count:     # lazy seed (covers mounted sub-app startup)
             _seed()
-            rows = s.exec(select(HubSlot)).all()
 
-        if location_id:
-            rows = [r for r in rows if r.location_id == location_id]
-        return [{"id": r.slot_id, "location_id": r.location_id, "when": r.when} for r in rows]
+    # Filter in SQL: SQLite walks the location index and the ORM only
+    # materializes matching rows, instead of every slot in the table.
+    stmt = select(HubSlot)
+    if location_id:
+        stmt = stmt.where(HubSlot.location_id == location_id)
+    rows = s.exec(stmt).all()
+
+    return [{"id": r.slot_id, "location_id": r.location_id, "when": r.when} for r in rows]
+
+
+
+class FirstAvailableIn(BaseModel):
+    """
+    Aggregated request: reserve the first open slot in a single round-trip
+    (replaces the GET /slots + POST /appointments pair for callers that
+    just want "book the next slot").
+    """
+    location_id: Optional[str] = None
+    cnp: Optional[str] = None
+
 
+@app.post("/slots/first-available")
+def first_available(data: FirstAvailableIn, s: Session = Depends(get_session)):
+    stmt = select(HubSlot)
+    if data.location_id:
+        stmt = stmt.where(HubSlot.location_id == data.location_id)
+    slot = s.exec(stmt).first()
+    if not slot:
+        return {"via": "HUB", "error": "no_slots"}
+
+    if data.cnp:
+        appt_id = f"id_{data.cnp}_ci"
+    else:
+        appt_id = f"APPT-{slot.slot_id}"
+
+    appt = HubAppt(appt_id=appt_id, when=slot.when, location=slot.location_id)
+    s.add(appt)
+    s.commit()
+    _write_audit(actor="system", action="APPT_CREATE", entity_type="appt", entity_id=appt.appt_id, details={
+        "slot_id": slot.slot_id,
+        "location": appt.location,
+        "when": appt.when,
+        "cnp": data.cnp,
+    })
+    return {
+        "via": "HUB",
+        "slot": {"id": slot.slot_id, "location_id": slot.location_id, "when": slot.when},
+        "appointment": {"appt_id": appt.appt_id, "when": appt.when, "location": appt.location},
+    }
 
 
-@app.get("/appointments", response_model=List[AppointmentOut])
-def list_appts():
+@app.get("/appointments")
+def list_appts(s: Session = Depends(get_session)):
     """
     Return all appointments.
     """
-    with Session(engine) as s:
-        rows = s.exec(select(HubAppt)).all()
-        return [{"appt_id": r.appt_id, "when": r.when, "location": r.location} for r in rows]
+    rows = s.exec(select(HubAppt)).all()
+    return [{"appt_id": r.appt_id, "when": r.when, "location": r.location} for r in rows]
 
 
-@app.get("/appointments/{appt_id}", response_model=AppointmentOut)
-def get_appt(appt_id: str):
+@app.get("/appointments/{appt_id}")
+def get_appt(appt_id: str, s: Session = Depends(get_session)):
     """
     Return a single appointment by appt_id.
     """
-    with Session(engine) as s:
-        r = s.exec(select(HubAppt).where(HubAppt.appt_id==appt_id)).first()
-        if not r:
-            raise HTTPException(404, "not found")
-        return {"appt_id": r.appt_id, "when": r.when, "location": r.location}
+    r = s.exec(_APPT_BY_ID, params={"appt_id": appt_id}).first()
+    if not r:
+        raise HTTPException(404, "not found")
+    return {"appt_id": r.appt_id, "when": r.when, "location": r.location}
 
 
 @app.post("/appointments", response_model=AppointmentOut)
-def create_appt(data: AppointmentIn):
+def create_appt(data: AppointmentIn, s: Session = Depends(get_session)):
     """
     Create a new appointment by reserving a slot.
     """
     cnp = data.cnp if data.cnp else None
 
-    with Session(engine) as s:
-        slot = s.exec(select(HubSlot).where(HubSlot.slot_id==data.slot_id)).first()
-        if not slot:
-            raise HTTPException(404, "slot not found")
-
-        # generate appointment id
-        if cnp:
-            appt_id = f"id_{cnp}_ci"
-        else:
-            appt_id = f"APPT-{slot}"
-
-        appt = HubAppt(appt_id=appt_id, when=slot.when, location=slot.location_id)
-        s.add(appt)
-        s.commit()
-        _write_audit(actor="system", action="APPT_CREATE", entity_type="appt", entity_id=appt.appt_id, details={
-            "slot_id": data.slot_id,
-            "location": appt.location,
-            "when": appt.when,
-            "cnp": cnp,
-        })
-        return {"appt_id": appt.appt_id,
-                "when": appt.when if hasattr(slot, "when") else slot["when"],
-                "location": appt.location}
+    slot = s.exec(_SLOT_BY_ID, params={"slot_id": data.slot_id}).first()
+    if not slot:
+        raise HTTPException(404, "slot not found")
+
+    # generate appointment id (slot_id, not the ORM object: f-stringing
+    # the row went through __repr__ and produced APPT-<HubSlot ...>)
+    appt_id = f"id_{cnp}_ci" if cnp else f"APPT-{slot.slot_id}"
+
+    appt = HubAppt(appt_id=appt_id, when=slot.when, location=slot.location_id)
+    s.add(appt)
+    s.commit()
+    _write_audit(actor="system", action="APPT_CREATE", entity_type="appt", entity_id=appt.appt_id, details={
+        "slot_id": data.slot_id,
+        "location": appt.location,
+        "when": appt.when,
+        "cnp": cnp,
+    })
+    return {"appt_id": appt.appt_id, "when": appt.when, "location": appt.location}
 
 
 @app.patch("/appointments/{appt_id}", response_model=AppointmentOut)
-def reschedule(appt_id: str, data: RescheduleIn):
+def reschedule(appt_id: str, data: RescheduleIn, s: Session = Depends(get_session)):
     """
     Reschedule an appointment to a new slot.
     """
-    with Session(engine) as s:
-        a = s.exec(select(HubAppt).where(HubAppt.appt_id==appt_id)).first()
-        if not a:
-            raise HTTPException(404, "not found")
-        slot = s.exec(select(HubSlot).where(HubSlot.slot_id==data.slot_id)).first()
-        if not slot:
-            raise HTTPException(404, "slot not found")
-        a.when = slot.when
-        a.location = slot.location_id
-        s.add(a)
-        s.commit()
-        _write_audit(actor="system", action="APPT_RESCHEDULE", entity_type="appt", entity_id=a.appt_id, details={
-            "new_slot_id": data.slot_id,
-            "location": a.location,
-            "when": a.when,
-        })
-        return {"appt_id": a.appt_id, "when": a.when, "location": a.location}
+    a = s.exec(_APPT_BY_ID, params={"appt_id": appt_id}).first()
+    if not a:
+        raise HTTPException(404, "not found")
+    slot = s.exec(_SLOT_BY_ID, params={"slot_id": data.slot_id}).first()
+    if not slot:
+        raise HTTPException(404, "slot not found")
+    a.when = slot.when
+    a.location = slot.location_id
+    s.add(a)
+    s.commit()
+    _write_audit(actor="system", action="APPT_RESCHEDULE", entity_type="appt", entity_id=a.appt_id, details={
+        "new_slot_id": data.slot_id,
+        "location": a.location,
+        "when": a.when,
+    })
+    return {"appt_id": a.appt_id, "when": a.when, "location": a.location}
 
 
 @app.delete("/appointments/{appt_id}")
-def cancel(appt_id: str):
+def cancel(appt_id: str, s: Session = Depends(get_session)):
     """
     Cancel (delete) an appointment.
     """
-    with Session(engine) as s:
-        a = s.exec(select(HubAppt).where(HubAppt.appt_id==appt_id)).first()
-        if not a:
-            raise HTTPException(404, "not found")
-        s.delete(a)
-        s.commit()
-        _write_audit(actor="system", action="APPT_CANCEL", entity_type="appt", entity_id=appt_id, details={
-            "location": a.location,
-            "when": a.when,
-        })
-        return {"ok": True}
+    a = s.exec(_APPT_BY_ID, params={"appt_id": appt_id}).first()
+    if not a:
+        raise HTTPException(404, "not found")
+    s.delete(a)
+    s.commit()
+    _write_audit(actor="system", action="APPT_CANCEL", entity_type="appt", entity_id=appt_id, details={
+        "location": a.location,
+        "when": a.when,
+    })
+    return {"ok": True}
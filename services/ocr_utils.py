@@ -13,12 +13,38 @@ from typing import Dict, List, Optional
 _EMAIL_RE = re.compile(r"\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\b")
 _PHONE_RE = re.compile(r"\b(0\d{9})\b")
 
+# Every pattern used per-extraction is compiled once here; the re module's
+# internal cache would otherwise be consulted (hash + lookup) on each call.
+_WS_RE = re.compile(r"\s+")
+# email/phone/CNP in one alternation: the engine walks the text once and
+# lastgroup tells us which field matched.
+_CONTACT_RE = re.compile(
+    r"(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)"
+    r"|(?P<telefon>\b0\d{9}\b)"
+    r"|(?P<cnp>\b\d{13}\b)"
+)
+_CNP13_RE = re.compile(r"\b(\d{13})\b")
+_NON_DIGIT_RE = re.compile(r"\D")
+# Deletion table for the CNP fallback: str.translate runs the strip in C.
+# Covers the Latin-1 range; anything above it is caught by the isdigit guard.
+_DIGIT_KEEP = str.maketrans("", "", "".join(chr(c) for c in range(256) if not chr(c).isdigit()))
+_LAST_NAME_LABEL_RE = re.compile(r"\b(nume|last name)\b", flags=re.IGNORECASE)
+_FIRST_NAME_LABEL_RE = re.compile(r"\b(prenume|first name|given name)\b", flags=re.IGNORECASE)
+_LAST_NAME_HEADER_RE = re.compile(r"\b(nom|last name)\b", flags=re.IGNORECASE)
+_FIRST_NAME_HEADER_RE = re.compile(r"\b(first name|given name)\b", flags=re.IGNORECASE)
+_NUME_KV_RE = re.compile(r"\bnume\s*[:=]\s*([A-Za-z\- ]{2,})", flags=re.IGNORECASE)
+_PRENUME_KV_RE = re.compile(r"\bprenume\s*[:=]\s*([A-Za-z\- ]{2,})", flags=re.IGNORECASE)
+_ADDR_START_RE = re.compile(r"\b(domiciliu|adresa|address)\b", flags=re.IGNORECASE)
+_ADDR_LABEL_STRIP_RE = re.compile(r"^.*\b(domiciliu|adresa|address)\b\s*[:=-]*\s*", flags=re.IGNORECASE)
+_NUM_FRAG_RE = re.compile(r"[0-9]{1,6}")
+
 
 def _norm_lines(raw: str) -> List[str]:
     if not raw:
         return []
-    lines = [re.sub(r"\s+", " ", ln).strip() for ln in raw.splitlines()]
-    return [ln for ln in lines if ln]
+    # split()/join collapse whitespace runs entirely in C — one pass, no
+    # regex engine, and empty lines drop out via the walrus filter.
+    return [s for ln in raw.splitlines() if (s := " ".join(ln.split()))]
 
 
 def _extract_cnp(raw: str) -> Optional[str]:
@@ -27,20 +53,18 @@ def _extract_cnp(raw: str) -> Optional[str]:
         return None
 
     # Common best case: exact 13 digits
-    m = re.search(r"\b(\d{13})\b", raw)
+    m = _CNP13_RE.search(raw)
     if m:
         return m.group(1)
 
-    # Fallback: collect digits and scan for 13-digit sequences
-    digits = re.sub(r"\D", "", raw)
+    # Fallback: strip non-digits (C-speed translate) and take the first
+    # 13-digit window — which is simply the first 13 digits collected.
+    digits = raw.translate(_DIGIT_KEEP)
+    if not digits.isdigit():
+        digits = _NON_DIGIT_RE.sub("", raw)
     if len(digits) < 13:
         return None
-    # pick first plausible 13-digit window
-    for i in range(0, len(digits) - 12):
-        cand = digits[i : i + 13]
-        if len(cand) == 13:
-            return cand
-    return None
+    return digits[:13]
 
 
 # Labels that typically indicate a NEW section/field (stop address accumulation)
@@ -68,10 +92,11 @@ def _is_addr_continuation(line: str) -> bool:
     if not l:
         return False
     # Allow typical continuation fragments: "nr. 168", "et. 4", "ap. 32", etc.
-    if _ADDR_CONT_PREFIX.search(l):
+    # (pattern is ^-anchored, so match() skips the scan past position 0)
+    if _ADDR_CONT_PREFIX.match(l):
         return True
     # Also allow pure numeric/short fragments that commonly appear on separate lines.
-    if re.fullmatch(r"[0-9]{1,6}", l):
+    if _NUM_FRAG_RE.fullmatch(l):
         return True
     return False
 
@@ -94,76 +119,56 @@ def _find_value_after_label(lines: List[str], label_pat: re.Pattern) -> Optional
     return None
 
 
-def _extract_name_from_ci(lines: List[str]) -> Dict[str, str]:
-    """CI often has bilingual headers; values typically appear on the next line."""
-    out: Dict[str, str] = {}
+def _extract_name_from_ci(lines: List[str], joined: str) -> Dict[str, str]:
+    """CI often has bilingual headers; values typically appear on the next line.
 
-    # Common CI headers
-    last_name_label = re.compile(r"\b(nume|last name)\b", flags=re.IGNORECASE)
-    first_name_label = re.compile(r"\b(prenume|first name|given name)\b", flags=re.IGNORECASE)
+    `joined` is the caller's "\n".join(lines) so the fallback scans reuse it
+    instead of materializing the text again.
+    """
+    out: Dict[str, str] = {}
 
     # Many CI layouts:
     #   "Nume/Nom/Last name" (header) then next line is the actual surname
     #   "Prenume/Prenom/First name" then next line is the given name
-    ln_last = _find_value_after_label(lines, last_name_label)
-    if ln_last and not re.search(r"\b(nom|last name)\b", ln_last, flags=re.IGNORECASE):
+    ln_last = _find_value_after_label(lines, _LAST_NAME_LABEL_RE)
+    if ln_last and not _LAST_NAME_HEADER_RE.search(ln_last):
         out["nume"] = ln_last.strip()
 
-    ln_first = _find_value_after_label(lines, first_name_label)
-    if ln_first and not re.search(r"\b(first name|given name)\b", ln_first, flags=re.IGNORECASE):
+    ln_first = _find_value_after_label(lines, _FIRST_NAME_LABEL_RE)
+    if ln_first and not _FIRST_NAME_HEADER_RE.search(ln_first):
         out["prenume"] = ln_first.strip()
 
     # Fallback: explicit patterns like "Nume: X" "Prenume: Y"
     if "nume" not in out:
-        m = re.search(r"\bnume\s*[:=]\s*([A-Za-z\- ]{2,})", "\n".join(lines), flags=re.IGNORECASE)
+        m = _NUME_KV_RE.search(joined)
         if m:
             out["nume"] = m.group(1).strip()
     if "prenume" not in out:
-        m = re.search(r"\bprenume\s*[:=]\s*([A-Za-z\- ]{2,})", "\n".join(lines), flags=re.IGNORECASE)
+        m = _PRENUME_KV_RE.search(joined)
         if m:
             out["prenume"] = m.group(1).strip()
 
     return out
 
 
-def _extract_address(lines: List[str]) -> Optional[str]:
-    if not lines:
-        return None
-
-    # Start markers for CI address
-    start_pats = [
-        re.compile(r"\b(domiciliu|adresa|address)\b", flags=re.IGNORECASE),
-    ]
+def _looks_like_street(l: str) -> bool:
+    return (
+        l.startswith("str")
+        or " str" in l
+        or "calea" in l
+        or l.startswith("bd")
+        or "bulevard" in l
+    )
 
-    start_idx = None
-    for i, ln in enumerate(lines):
-        if any(p.search(ln) for p in start_pats):
-            start_idx = i
-            break
 
-    # If no explicit marker, fallback to the first line that looks like a street address.
-    if start_idx is None:
-        for i, ln in enumerate(lines):
-            l = ln.lower()
-            if (
-                l.startswith("str")
-                or " str" in l
-                or "calea" in l
-                or l.startswith("bd")
-                or "bulevard" in l
-            ):
-                start_idx = i
-                break
-        if start_idx is None:
-            return None
-
-    # Collect from start_idx onward, but stop when a new field label starts.
+def _collect_address(lines: List[str], start_idx: int) -> Optional[str]:
+    """Collect from start_idx onward, stopping when a new field label starts."""
     buf: List[str] = []
     for j in range(start_idx, len(lines)):
         ln = lines[j].strip()
         if j == start_idx:
             # Remove the label part if present
-            ln = re.sub(r"^.*\b(domiciliu|adresa|address)\b\s*[:=-]*\s*", "", ln, flags=re.IGNORECASE).strip()
+            ln = _ADDR_LABEL_STRIP_RE.sub("", ln).strip()
             if ln:
                 buf.append(ln)
             continue
@@ -173,8 +178,8 @@ def _extract_address(lines: List[str]) -> Optional[str]:
             buf.append(ln)
             continue
 
-        # Stop when we hit another label-like line
-        if _ADDR_STOP_LABELS.search(ln):
+        # Stop when we hit another label-like line (^-anchored: match())
+        if _ADDR_STOP_LABELS.match(ln):
             break
 
         # Otherwise, keep if it looks like address content and not too short.
@@ -190,6 +195,24 @@ def _extract_address(lines: List[str]) -> Optional[str]:
     return ", ".join(buf)
 
 
+def _extract_address(lines: List[str]) -> Optional[str]:
+    if not lines:
+        return None
+
+    # Single scan: note both the first explicit marker and the first
+    # street-looking fallback line, instead of one full pass per rule.
+    fallback_idx = None
+    for i, ln in enumerate(lines):
+        if _ADDR_START_RE.search(ln):
+            return _collect_address(lines, i)
+        if fallback_idx is None and _looks_like_street(ln.lower()):
+            fallback_idx = i
+
+    if fallback_idx is None:
+        return None
+    return _collect_address(lines, fallback_idx)
+
+
 def extract_person_fields(raw: str) -> Dict[str, str]:
     """Extract person fields from OCR text.
 
@@ -207,19 +230,22 @@ def extract_person_fields(raw: str) -> Dict[str, str]:
 
     out: Dict[str, str] = {}
 
-    cnp = _extract_cnp(raw)
-    if cnp:
-        out["cnp"] = cnp
-
-    m = _EMAIL_RE.search(raw)
-    if m:
-        out["email"] = m.group(1)
+    # One combined scan instead of three independent passes over raw.
+    for m in _CONTACT_RE.finditer(raw):
+        grp = m.lastgroup
+        if grp not in out:
+            out[grp] = m.group(grp)
+        if len(out) == 3:
+            break
 
-    m = _PHONE_RE.search(raw)
-    if m:
-        out["telefon"] = m.group(1)
+    if "cnp" not in out:
+        # Fast path missed (separators inside the CNP): run the fallback.
+        cnp = _extract_cnp(raw)
+        if cnp:
+            out["cnp"] = cnp
 
-    out.update(_extract_name_from_ci(lines))
+    joined = "\n".join(lines)
+    out.update(_extract_name_from_ci(lines, joined))
 
     addr = _extract_address(lines)
     if addr:
@@ -10,7 +10,10 @@
 # Uses the shared SQLite DB via SQLModel.
 from __future__ import annotations
 from fastapi import Request, Response
-import json
+import asyncio
+import concurrent.futures
+import hashlib
+import unicodedata
 import os
 import io
 import re
@@ -19,13 +22,15 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, FastAPI
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, FastAPI
 from fastapi.responses import JSONResponse
+from sqlalchemy import insert
 from sqlmodel import Session, select
 
 
+from db import dumps_bytes as db_dumps_bytes, loads as db_loads
 from db import (
-    engine, init_db,
+    engine, get_session, init_db,
     Case, Payment, Signature, Notification,
     Upload as UploadRec,
     Task,
@@ -33,6 +38,9 @@ from db import (
     AuditLog,
 )
 
+from audit import write_audit
+from jsonx import JSONXResponse
+
 from .ocr_utils import extract_person_fields, validate_person_simple
 
 # Ensure tables exist
@@ -46,6 +54,57 @@ init_db()
 # (easyocr pulls torch; on CPU this is still OK for a prototype.)
 _OCR_READER = None
 
+# Bounded pool for OCR inference: readtext is CPU-heavy (PIL decode + CNN)
+# and must never run on the event loop; two workers keep concurrent uploads
+# from oversubscribing a prototype CPU.
+_OCR_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="ocr")
+
+# Micro-batching: concurrent uploads inside the same window share one executor
+# hop (one Python<->pool round-trip per batch instead of per image).
+# Retried uploads are common (flaky connections, double-clicks); identical
+# bytes skip the CNN entirely. Bounded dict keyed by content digest,
+# oldest-out once full — same eviction idiom as the token cache in auth.py.
+_OCR_CACHE_MAX = 512
+_ocr_cache: Dict[bytes, str] = {}
+
+
+def _ocr_cache_put(h: bytes, text: str) -> None:
+    if len(_ocr_cache) >= _OCR_CACHE_MAX:
+        _ocr_cache.pop(next(iter(_ocr_cache)))
+    _ocr_cache[h] = text
+
+
+_OCR_BATCH_MAX = 8
+_ocr_q: Optional[asyncio.Queue] = None
+_ocr_worker_task: Optional[asyncio.Task] = None
+
+
+def _ocr_batch(contents: List[bytes]) -> List[str]:
+    return [_ocr_text_from_bytes(c) for c in contents]
+
+
+async def _ocr_worker() -> None:
+    assert _ocr_q is not None
+    loop = asyncio.get_running_loop()
+    while True:
+        items = [await _ocr_q.get()]
+        while len(items) < _OCR_BATCH_MAX:
+            try:
+                items.append(_ocr_q.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            texts = await loop.run_in_executor(
+                _OCR_POOL, _ocr_batch, [content for content, _ in items])
+        except Exception as exc:
+            for _, fut in items:
+                if not fut.done():
+                    fut.set_exception(exc)
+            continue
+        for (_, fut), txt in zip(items, texts):
+            if not fut.done():
+                fut.set_result(txt)
+
 def _get_easyocr_reader():
     global _OCR_READER
     if _OCR_READER is not None:
@@ -54,7 +113,21 @@ def _get_easyocr_reader():
         import easyocr  # type: ignore
         # Romanian isn't always a separate model in easyocr; 'en' covers Latin well, 'ro' may be supported depending on version.
         # We include both, and easyocr will ignore unsupported ones.
-        _OCR_READER = easyocr.Reader(['ro', 'en'], gpu=False)
+        reader = easyocr.Reader(['ro', 'en'], gpu=False)
+        if os.getenv("OCR_QUANTIZE") == "1":
+            # Dynamic int8 quantization roughly halves CPU inference cost on
+            # AVX2 hosts for Latin text; opt-in since accuracy loss, while
+            # small, is workload-dependent.
+            try:
+                import torch  # type: ignore
+
+                reader.detector = torch.quantization.quantize_dynamic(
+                    reader.detector, {torch.nn.Linear}, dtype=torch.qint8)
+                reader.recognizer = torch.quantization.quantize_dynamic(
+                    reader.recognizer, {torch.nn.Linear}, dtype=torch.qint8)
+            except Exception:
+                pass
+        _OCR_READER = reader
         return _OCR_READER
     except Exception:
         return None
@@ -66,17 +139,37 @@ def _ocr_text_from_bytes(content: bytes) -> str:
         return ""
 
     try:
-        from PIL import Image
         import numpy as np  # type: ignore
 
-        im = Image.open(io.BytesIO(content)).convert("RGB")
-        # Mild resize to help OCR on small photos; keep it simple.
-        w, h = im.size
-        if max(w, h) < 1200:
-            scale = 1200 / max(w, h)
-            im = im.resize((int(w*scale), int(h*scale)))
+        arr = None
+        try:
+            # cv2.imdecode goes straight from bytes to a numpy buffer, and
+            # INTER_AREA downscaling feeds the CNN a tensor near its
+            # training resolution (~960 long edge) instead of upscaling
+            # small photos to 1200px as before.
+            import cv2  # type: ignore
+
+            arr = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
+            if arr is not None:
+                h, w = arr.shape[:2]
+                if max(h, w) > 960:
+                    scale = 960 / max(h, w)
+                    arr = cv2.resize(arr, (int(w * scale), int(h * scale)),
+                                     interpolation=cv2.INTER_AREA)
+                arr = cv2.cvtColor(arr, cv2.COLOR_BGR2RGB)
+        except ImportError:
+            pass
+
+        if arr is None:
+            from PIL import Image
+
+            im = Image.open(io.BytesIO(content)).convert("RGB")
+            w, h = im.size
+            if max(w, h) > 960:
+                scale = 960 / max(w, h)
+                im = im.resize((int(w * scale), int(h * scale)))
+            arr = np.array(im)
 
-        arr = np.array(im)
         out = reader.readtext(arr, detail=0, paragraph=True)
         if isinstance(out, list):
             return "\n".join([str(x) for x in out if x])
@@ -102,16 +195,11 @@ def _now_iso() -> str:
 def _gen_case_id(prefix="CASE") -> str:
     return f"{prefix}-{uuid.uuid4().hex[:8].upper()}"
 
-def _read_json(txt: Optional[str]) -> Dict[str, Any]:
-    if not txt:
-        return {}
-    try:
-        return json.loads(txt)
-    except Exception:
-        return {}
+def _read_json(txt: Optional[bytes]) -> Dict[str, Any]:
+    return db_loads(txt)
 
-def _write_json(obj: Any) -> str:
-    return json.dumps(obj, ensure_ascii=False)
+def _write_json(obj: Any) -> bytes:
+    return db_dumps_bytes(obj)
 
 def _infer_program_from_application(app: Dict[str, Any]) -> str:
     # when creating a case we allow either "type" or "program" to indicate channel
@@ -124,17 +212,19 @@ def _infer_program_from_application(app: Dict[str, Any]) -> str:
 
 
 def _audit(actor: str, action: str, entity_type: str = "", entity_id: str = "", details: Any = None) -> None:
-    """Minimal audit logging for operator-facing traceability (prototype level)."""
+    """Minimal audit logging for operator-facing traceability (prototype level).
+
+    Delegates to the shared batched writer: events are queued and flushed in
+    one transaction per batch, so no request pays the WAL fsync itself.
+    """
     try:
-        with Session(engine) as s:
-            s.add(AuditLog(
-                actor=actor or "system",
-                action=action,
-                entity_type=entity_type or "",
-                entity_id=entity_id or "",
-                details_json=_write_json(details or {}),
-            ))
-            s.commit()
+        write_audit(
+            actor=actor or "system",
+            action=action,
+            entity_type=entity_type or "",
+            entity_id=entity_id or "",
+            details=details or {},
+        )
     except Exception:
         # Never break the demo because audit failed.
         pass
@@ -158,13 +248,65 @@ DOC_KEYWORDS = {
     "cont_bancar": ["iban", "extras cont", "cont bancar"],
 }
 
-def _doc_kinds_from_text(text: str) -> List[str]:
+def _fold(text: str) -> str:
+    """Lowercase and strip diacritics so 'naștere' matches 'nastere'."""
     t = (text or "").lower()
-    found = []
-    for kind, kws in DOC_KEYWORDS.items():
-        if any(kw in t for kw in kws):
-            found.append(kind)
-    return list(sorted(set(found)))
+    if t.isascii():
+        return t
+    return "".join(c for c in unicodedata.normalize("NFD", t)
+                   if not unicodedata.combining(c))
+
+
+# Kinds as a fixed bit order: matches accumulate into an int mask instead
+# of a set, and the result list comes back pre-sorted with no set/sort
+# allocations per call.
+_KIND_ORDER = tuple(sorted(DOC_KEYWORDS))
+_KIND_BIT = {k: 1 << i for i, k in enumerate(_KIND_ORDER)}
+
+# Some keywords belong to several kinds (e.g. "contract inchiriere"), so
+# each keyword maps to the OR of its kinds' bits.
+_KW_MASK: Dict[str, int] = {}
+for _kind, _kws in DOC_KEYWORDS.items():
+    for _kw in _kws:
+        _kw = _fold(_kw)
+        _KW_MASK[_kw] = _KW_MASK.get(_kw, 0) | _KIND_BIT[_kind]
+
+# Aho-Corasick scans the text once for all ~30 keywords; the keyword loop
+# below stays as the fallback when the C extension is not installed.
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+if _ahocorasick is not None:
+    _KW_AC = _ahocorasick.Automaton()
+    for _kw, _mask in _KW_MASK.items():
+        _KW_AC.add_word(_kw, _mask)
+    _KW_AC.make_automaton()
+    _KW_RX = None
+else:
+    # Fallback DFA: one alternation regex scanned in C instead of a Python
+    # loop of substring searches. Longest-first ordering so overlapping
+    # keywords ("buletin" / "buletin vechi") prefer the full phrase.
+    _KW_AC = None
+    _KW_RX = re.compile("|".join(
+        sorted(map(re.escape, _KW_MASK), key=len, reverse=True)))
+
+del _kind, _kws, _kw, _mask
+
+
+def _doc_kinds_from_text(text: str) -> List[str]:
+    t = _fold(text)
+    mask = 0
+    if _KW_AC is not None:
+        for _, m in _KW_AC.iter(t):
+            mask |= m
+    else:
+        for m in _KW_RX.finditer(t):
+            mask |= _KW_MASK[m.group(0)]
+    if not mask:
+        return []
+    return [k for k in _KIND_ORDER if mask & _KIND_BIT[k]]
 
 @local.get("/")
 def local_root():
@@ -187,19 +329,46 @@ async def upload_file(
     Main app owns DB persistence and override.
     """
 
-    # Read file content and perform OCR
-    content = await file.read()
-    ocr_text = _ocr_text_from_bytes(content) or file.filename.lower()
+    # Stream into a bytearray in 64KB chunks: bounded allocations per read
+    # and no single full-size read buffer; np.frombuffer later views this
+    # memory without copying.
+    buf = bytearray()
+    while True:
+        chunk = await file.read(64 * 1024)
+        if not chunk:
+            break
+        buf.extend(chunk)
+    return await _ocr_upload_response_async(bytes(buf), file.filename, docHint, sid)
+
+
+async def _ocr_upload_response_async(content: bytes, filename: str, docHint: str, sid: str) -> dict:
+    """OCR in the bounded pool (batched when the worker runs), then shape the response."""
+    h = hashlib.blake2b(content, digest_size=16).digest()
+    ocr_text = _ocr_cache.get(h)
+    if ocr_text is None:
+        loop = asyncio.get_running_loop()
+        if _ocr_q is not None:
+            fut: asyncio.Future = loop.create_future()
+            _ocr_q.put_nowait((content, fut))
+            ocr_text = await fut
+        else:
+            ocr_text = await loop.run_in_executor(_OCR_POOL, _ocr_text_from_bytes, content)
+        _ocr_cache_put(h, ocr_text)
+    return _build_upload_response(ocr_text, content, filename, docHint, sid)
+
+
+def _build_upload_response(ocr_text: str, content: bytes, filename: str, docHint: str, sid: str) -> dict:
+    ocr_text = ocr_text or (filename or "").lower()
+
+    # One keyword scan (and one accent fold) per upload: the recognized
+    # list doubles as the fallback kind source below.
+    recognized = _doc_kinds_from_text(ocr_text)
 
     # Prefer hint given by user when not 'auto'
-    kind = None if docHint == "auto" else docHint
-
-    # Fallback detection via filename keywords (toy OCR)
-    if not kind:
-        kinds = _doc_kinds_from_text(ocr_text)
-        kind = kinds[0] if kinds else None
-
-    recognized = _doc_kinds_from_text(ocr_text)
+    if docHint != "auto":
+        kind = docHint
+    else:
+        kind = recognized[0] if recognized else None
 
     # Optional audit (no DB id)
     try:
@@ -210,7 +379,7 @@ async def upload_file(
             entity_id="mock",
             details={
                 "session_id": sid,
-                "filename": file.filename,
+                "filename": filename,
                 "kind": kind,
                 "size": len(content),
             },
@@ -223,7 +392,7 @@ async def upload_file(
         "upload": {
             "id": "mock",
             "session_id": sid,
-            "filename": file.filename,
+            "filename": filename,
             "kind": kind,
             "size": len(content),
             "ocr_text": ocr_text,
@@ -232,6 +401,25 @@ async def upload_file(
     }
 
 
+@local.post("/uploads/stream")
+async def upload_file_stream(request: Request):
+    """
+    Streaming fast path for /uploads: raw octet-stream body, metadata in
+    X-Filename / X-SID / X-DocHint headers. Avoids multipart encode/decode
+    on both sides; bytes are consumed chunk-by-chunk as they arrive.
+    """
+    from urllib.parse import unquote
+
+    filename = unquote(request.headers.get("x-filename", "upload.bin"))
+    sid = request.headers.get("x-sid", "anon")
+    doc_hint = request.headers.get("x-dochint", "auto")
+
+    chunks = []
+    async for chunk in request.stream():
+        chunks.append(chunk)
+    return await _ocr_upload_response_async(b"".join(chunks), filename, doc_hint, sid)
+
+
 @local.delete("/uploads/purge")
 def purge_uploads(session_id: str = Query(..., alias="session_id")):
     # Stateless mock: nothing to purge here
@@ -244,37 +432,36 @@ def _seed_social_slots():
         if has_any:
             return
         base = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        # One executemany INSERT for the whole seed: no per-row ORM
+        # unit-of-work, and the same shape other seed paths can copy.
         rows = []
         for i in range(6):
-            rows.append(SocialSlot(id=f"AS-{i+1}", location_id="Bucuresti-S1",
-                                   when=base + timedelta(days=i, hours=9)))
-            rows.append(SocialSlot(id=f"AS-{i+7}", location_id="Ilfov-01",
-                                   when=base + timedelta(days=i, hours=11)))
-        for r in rows:
-            s.add(r)
+            rows.append({"id": f"AS-{i+1}", "location_id": "Bucuresti-S1",
+                         "when": base + timedelta(days=i, hours=9)})
+            rows.append({"id": f"AS-{i+7}", "location_id": "Ilfov-01",
+                         "when": base + timedelta(days=i, hours=11)})
+        s.execute(insert(SocialSlot), rows)
         s.commit()
 
 _seed_social_slots()
 
 
 @local.get("/slots-social", response_model=List[SocialSlot])
-def list_social_slots(location_id: Optional[str] = None):
-    with Session(engine) as s:
-        stmt = select(SocialSlot)
-        if location_id:
-            stmt = stmt.where(SocialSlot.location_id == location_id)
-        rows = s.exec(stmt).all()
+def list_social_slots(location_id: Optional[str] = None, s: Session = Depends(get_session)):
+    stmt = select(SocialSlot)
+    if location_id:
+        stmt = stmt.where(SocialSlot.location_id == location_id)
+    rows = s.exec(stmt).all()
     return [{"id": r.id, "location_id": r.location_id, "when": r.when.isoformat()} for r in rows]
 
 
 @local.post("/reserve-social")
-def reserve_social(payload: Dict[str, Any]):
+def reserve_social(payload: Dict[str, Any], s: Session = Depends(get_session)):
     slot_id = payload.get("slot_id")
     cnp = payload.get("cnp") or "anon"
-    with Session(engine) as s:
-        slot = s.get(SocialSlot, slot_id)
-        if not slot:
-            raise HTTPException(status_code=404, detail="slot not found")
+    slot = s.get(SocialSlot, slot_id)
+    if not slot:
+        raise HTTPException(status_code=404, detail="slot not found")
     appt = {
         "appt_id": f"id_{cnp}_as",
         "slot_id": slot_id,
@@ -286,13 +473,13 @@ def reserve_social(payload: Dict[str, Any]):
 
 # --------------------------- cases ---------------------------
 @local.post("/cases")
-def create_case(payload: Dict[str, Any]):
+def create_case(payload: Dict[str, Any], s: Session = Depends(get_session)):
     """
     Create a Case that matches db.py:
       - case_id: public id
       - type: application type or program (e.g., CEI/CIS/CIP or AS)
       - status: NEW
-      - person_json / payload_json: raw JSON strings for flexibility
+      - person_json / payload_json: raw JSON blobs for flexibility
     Expected payload: { "person": {...}, "application": {...} }
     """
     person = payload.get("person") or {}
@@ -312,10 +499,9 @@ def create_case(payload: Dict[str, Any]):
         person_json=_write_json(person),
         payload_json=_write_json(app),
     )
-    with Session(engine) as s:
-        s.add(row)
-        s.commit()
-        s.refresh(row)
+    s.add(row)
+    s.commit()
+    s.refresh(row)
 
     _audit(actor="system", action="CASE_CREATE", entity_type="case", entity_id=row.case_id, details={
         "type": row.type,
@@ -333,38 +519,39 @@ def create_case(payload: Dict[str, Any]):
 
 
 @local.get("/cases")
-def list_cases(type: Optional[str] = None):
-    with Session(engine) as s:
-        rows = s.exec(select(Case)).all()
-    out = []
-    for r in rows:
-        pj = _read_json(r.person_json)
-        aj = _read_json(r.payload_json)
-        if type and r.type != type:
-            continue
-        out.append({
+def list_cases(type: Optional[str] = None, limit: int = 100, offset: int = 0,
+               s: Session = Depends(get_session)):
+    # Filter and page in SQL so only the returned rows are materialized and
+    # JSON-parsed; previously the whole table was loaded and filtered here.
+    limit = max(1, min(int(limit or 100), 500))
+    stmt = select(Case)
+    if type:
+        stmt = stmt.where(Case.type == type)
+    stmt = stmt.order_by(Case.id).limit(limit).offset(max(0, int(offset or 0)))
+    return [
+        {
             "case_id": r.case_id,
             "type": r.type,
             "status": r.status,
-            "person": pj,
-            "application": aj,
-        })
-    return out
+            "person": _read_json(r.person_json),
+            "application": _read_json(r.payload_json),
+        }
+        for r in s.exec(stmt).all()
+    ]
 
 
 @local.patch("/cases/{case_id}")
-def update_case_status(case_id: str, status: str = Query(...)):
+def update_case_status(case_id: str, status: str = Query(...), s: Session = Depends(get_session)):
     # Hard allowlist for demo safety & predictable operator UX.
     allowed = {"NEW","SCHEDULED","IN_PROCESS","READY_FOR_PICKUP","CLOSED"}
     if status not in allowed:
         raise HTTPException(status_code=400, detail=f"invalid status: {status}")
-    with Session(engine) as s:
-        row = s.exec(select(Case).where(Case.case_id == case_id)).first()
-        if not row:
-            raise HTTPException(status_code=404, detail="case not found")
-        row.status = status
-        s.add(row)
-        s.commit()
+    row = s.exec(select(Case).where(Case.case_id == case_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="case not found")
+    row.status = status
+    s.add(row)
+    s.commit()
 
     _audit(actor="system", action="CASE_STATUS_UPDATE", entity_type="case", entity_id=case_id, details={
         "new_status": status,
@@ -373,44 +560,43 @@ def update_case_status(case_id: str, status: str = Query(...)):
 
 # --------------------------- tasks (HITL) ---------------------------
 @local.get("/tasks")
-def list_tasks(type: Optional[str] = None, status: Optional[str] = None):
+def list_tasks(type: Optional[str] = None, status: Optional[str] = None,
+               s: Session = Depends(get_session)):
     """
     Since Task doesn't carry `type` in db.py, we infer it by looking up the Case by `case_id`.
     """
-    with Session(engine) as s:
-        tasks = s.exec(select(Task)).all()
-        out = []
-        for t in tasks:
-            c = s.exec(select(Case).where(Case.case_id == t.case_id)).first()
-            c_type = c.type if c else None
-            if status and t.status != status:
-                continue
-            if type and c_type != type:
-                continue
-            out.append({
-                "id": t.id,
-                "kind": t.kind,
-                "status": t.status,
-                "assignee": t.assignee,
-                "notes": t.notes,
-                "case_id": t.case_id,
-                "case_type": c_type,
-            })
+    # One outer join instead of a per-task Case lookup (classic N+1); the
+    # status/type filters run in SQL as well.
+    stmt = select(Task, Case).join(Case, Case.case_id == Task.case_id, isouter=True)
+    if status:
+        stmt = stmt.where(Task.status == status)
+    if type:
+        stmt = stmt.where(Case.type == type)
+    out = []
+    for t, c in s.exec(stmt).all():
+        out.append({
+            "id": t.id,
+            "kind": t.kind,
+            "status": t.status,
+            "assignee": t.assignee,
+            "notes": t.notes,
+            "case_id": t.case_id,
+            "case_type": c.type if c else None,
+        })
     return out
 
 
 @local.post("/tasks/{task_id}/claim")
-def claim_task(task_id: int, payload: Dict[str, Any]):
+def claim_task(task_id: int, payload: Dict[str, Any], s: Session = Depends(get_session)):
     assignee = payload.get("assignee") or "operator@demo.local"
-    with Session(engine) as s:
-        t = s.get(Task, task_id)
-        if not t:
-            raise HTTPException(status_code=404, detail="task not found")
-        t.status = "ASSIGNED"
-        t.assignee = assignee
-        s.add(t)
-        s.commit()
-        s.refresh(t)
+    t = s.get(Task, task_id)
+    if not t:
+        raise HTTPException(status_code=404, detail="task not found")
+    t.status = "ASSIGNED"
+    t.assignee = assignee
+    s.add(t)
+    s.commit()
+    s.refresh(t)
 
     _audit(actor=assignee, action="TASK_CLAIM", entity_type="task", entity_id=str(task_id), details={
         "case_id": t.case_id,
@@ -420,17 +606,16 @@ def claim_task(task_id: int, payload: Dict[str, Any]):
 
 
 @local.post("/tasks/{task_id}/complete")
-def complete_task(task_id: int, payload: Dict[str, Any]):
+def complete_task(task_id: int, payload: Dict[str, Any], s: Session = Depends(get_session)):
     notes = payload.get("notes")
-    with Session(engine) as s:
-        t = s.get(Task, task_id)
-        if not t:
-            raise HTTPException(status_code=404, detail="task not found")
-        t.status = "DONE"
-        t.notes = notes
-        s.add(t)
-        s.commit()
-        s.refresh(t)
+    t = s.get(Task, task_id)
+    if not t:
+        raise HTTPException(status_code=404, detail="task not found")
+    t.status = "DONE"
+    t.notes = notes
+    s.add(t)
+    s.commit()
+    s.refresh(t)
 
     _audit(actor=str(t.assignee or "operator@demo.local"), action="TASK_COMPLETE", entity_type="task", entity_id=str(task_id), details={
         "case_id": t.case_id,
@@ -440,11 +625,10 @@ def complete_task(task_id: int, payload: Dict[str, Any]):
 
 
 @local.get("/audit")
-def list_audit(limit: int = 100):
+def list_audit(limit: int = 100, s: Session = Depends(get_session)):
     """Return latest audit entries (prototype debug endpoint)."""
     limit = max(1, min(int(limit or 100), 500))
-    with Session(engine) as s:
-        rows = s.exec(select(AuditLog).order_by(AuditLog.id.desc()).limit(limit)).all()
+    rows = s.exec(select(AuditLog).order_by(AuditLog.id.desc()).limit(limit)).all()
     out = []
     for r in rows:
         out.append({
@@ -458,5 +642,33 @@ def list_audit(limit: int = 100):
         })
     return out
 
-app = FastAPI(title="Primarie local mock")
-app.include_router(local)
\ No newline at end of file
+app = FastAPI(title="Primarie local mock", default_response_class=JSONXResponse)
+app.include_router(local)
+
+
+@app.on_event("startup")
+async def _warm_ocr_reader():
+    """Load the easyocr model off the first request's critical path."""
+    asyncio.get_running_loop().run_in_executor(_OCR_POOL, _get_easyocr_reader)
+
+
+@app.on_event("startup")
+async def _start_audit_worker():
+    """Batched audit writer for standalone runs (main app starts its own)."""
+    from audit import start_audit_worker
+    await start_audit_worker()
+
+
+@app.on_event("shutdown")
+async def _stop_audit_worker():
+    from audit import stop_audit_worker
+    await stop_audit_worker()
+
+
+@app.on_event("startup")
+async def _start_ocr_worker():
+    """Start the micro-batching OCR worker."""
+    global _ocr_q, _ocr_worker_task
+    if _ocr_worker_task is None or _ocr_worker_task.done():
+        _ocr_q = asyncio.Queue()
+        _ocr_worker_task = asyncio.create_task(_ocr_worker())
\ No newline at end of file
@@ -3,7 +3,9 @@
 # Centralized message templates with formatting.
 from __future__ import annotations
 
-from typing import Any, Dict
+import string as _string
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
 DEFAULT_LANG = "ro"  # ro = Romanian (ASCII-only), en = English
 
@@ -205,28 +207,112 @@ MESSAGES: Dict[str, Dict[str, str]] = {
     },
 }
 
+# MESSAGES is fixed at import, so resolve every (lang, key) -> template once
+# here, fallback to DEFAULT_LANG included. Most keys carry no placeholders,
+# and for those translate_msg returns the template directly without paying
+# for str.format dispatch or the guarding try/except.
+_LANGS = {lang for table in MESSAGES.values() for lang in table}
+_RESOLVED: Dict[Tuple[str, str], str] = {
+    (lang, key): table.get(lang) or table.get(DEFAULT_LANG) or ""
+    for key, table in MESSAGES.items()
+    for lang in _LANGS
+}
+def _compile_template(tmpl: str) -> Optional[Callable[[Dict[str, Any]], str]]:
+    """Turn a '{name}' template into a fill-and-join closure.
+
+    str.format re-parses the template and its spec mini-language on every
+    call; these templates are fixed at import, so the literal/slot split is
+    done once here and each call is list copy + str() + join. Templates
+    using conversions or format specs fall back to str.format."""
+    pieces = []
+    slots = []
+    for lit, field, spec, conv in _string.Formatter().parse(tmpl):
+        if spec or conv:
+            return None
+        if lit:
+            pieces.append(lit)
+        if field is not None:
+            slots.append((len(pieces), field))
+            pieces.append("")
+
+    def _fmt(kw: Dict[str, Any], _pieces=pieces, _slots=slots) -> str:
+        out = _pieces[:]
+        for i, name in _slots:
+            out[i] = str(kw[name])
+        return "".join(out)
+
+    return _fmt
+
+
+# Compiled only for placeholder-bearing templates; plain messages never
+# reach the formatter path. _REQUIRED holds each template's field names so
+# translate_msg can test kwargs coverage up front instead of letting the
+# formatter raise.
+_FORMATTERS: Dict[Tuple[str, str], Callable[[Dict[str, Any]], str]] = {}
+_REQUIRED: Dict[Tuple[str, str], frozenset] = {}
+for _lk, _tmpl in _RESOLVED.items():
+    if "{" in _tmpl:
+        _fn = _compile_template(_tmpl)
+        _FORMATTERS[_lk] = _fn if _fn is not None else (
+            lambda kw, _t=_tmpl: _t.format(**kw))
+        _REQUIRED[_lk] = frozenset(
+            f for _, f, _, _ in _string.Formatter().parse(_tmpl) if f)
+del _lk, _tmpl
+
+# Read-only views: the tables are policy data built once above, and the
+# proxy makes accidental runtime mutation a TypeError instead of a silent
+# cross-request behavior change.
+_RESOLVED: Mapping[Tuple[str, str], str] = MappingProxyType(_RESOLVED)
+_FORMATTERS: Mapping[Tuple[str, str], Callable[[Dict[str, Any]], str]] = \
+    MappingProxyType(_FORMATTERS)
+_REQUIRED: Mapping[Tuple[str, str], frozenset] = MappingProxyType(_REQUIRED)
+
+
+# Accepted spellings -> canonical code, one O(1) probe instead of linear
+# tuple membership scans per alias group.
+_LANG_MAP = {
+    "ro": "ro", "romana": "ro", "romanian": "ro",
+    "en": "en", "english": "en",
+}
+
+
 # Normalize various language inputs to a standard code. Default to DEFAULT_LANG if unrecognized.
 def _normalize_lang(x: str) -> str:
-    x = (x or "").strip().lower()
-    if x in ("ro", "romana", "romanian"):
-        return "ro"
-    if x in ("en", "english"):
-        return "en"
-    return DEFAULT_LANG
+    if x in _LANG_MAP:
+        # Already-canonical input ("ro"/"en", the common case) skips the
+        # strip/lower allocation entirely.
+        return _LANG_MAP[x]
+    return _LANG_MAP.get((x or "").strip().lower(), DEFAULT_LANG)
 
 # Get the language code from the app context, normalizing it and defaulting to DEFAULT_LANG if not set or unrecognized.
 def get_lang(app: Any) -> str:
-    if isinstance(app, dict):
-        return _normalize_lang(app.get("lang") or DEFAULT_LANG)
-    return DEFAULT_LANG
+    # EAFP instead of an isinstance(app, dict) check per call: every real
+    # caller passes the app-state dict, so the happy path pays nothing and
+    # non-mapping inputs (None in a few template contexts) land in the
+    # except arm.
+    try:
+        raw = app.get("lang")
+        # translate_msg runs dozens of times per render against the same
+        # app dict, so the normalized code is memoized on it alongside the
+        # raw value it came from; the cache self-invalidates when the user
+        # switches language.
+        cached = app.get("_lang_norm")
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+        norm = _normalize_lang(raw or DEFAULT_LANG)
+        app["_lang_norm"] = (raw, norm)
+        return norm
+    except (AttributeError, TypeError):
+        return DEFAULT_LANG
 
 # Translate a message key to the appropriate language, applying formatting if needed.
 def translate_msg(app: Any, key: str, **kwargs) -> str:
     lang = get_lang(app)
-    table = MESSAGES.get(key) or {}
-    template = table.get(lang) or table.get(DEFAULT_LANG) or ""
-    try:
-        return template.format(**kwargs)
-    except Exception:
-        # never crash due to formatting in prototype
-        return template
+    if kwargs:
+        fn = _FORMATTERS.get((lang, key))
+        # Coverage checked up front: the common path never sets up exception
+        # handling, and a template with missing kwargs comes back raw (as
+        # before) instead of half-formatted or crashing.
+        if fn is not None and _REQUIRED[(lang, key)] <= kwargs.keys():
+            return fn(kwargs)
+    return _RESOLVED.get((lang, key), "")